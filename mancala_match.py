@@ -0,0 +1,284 @@
+"""Parties ordinateur contre ordinateur sans interface graphique.
+
+Sert à produire des parties d'auto-apprentissage (self-play) et à comparer
+les moteurs entre eux. Chaque partie est enregistrée sous forme de
+dictionnaire JSON (une ligne par partie) :
+
+    {"players": ["minimax", "alt"], "first": "player2",
+     "moves": [["player2", "C"], ["player1", "F"], ...],
+     "times": [0.0, 0.012, ...], "scores": [null, 2, ...],
+     "store1": 26, "store2": 22, "time1": 1.8, "time2": 0.9}
+
+`time1` / `time2` sont les temps de réflexion cumulés (secondes) de chaque
+camp, pour comparer la force des moteurs à temps égal ; `times` donne le
+temps de chaque coup (0 pour les coups d'ouverture aléatoires). `scores`
+donne l'évaluation du moteur qui a joué le coup (attribut lastScore), du
+point de vue de player1 et dans l'unité du moteur : différence de stores
+pour minimax, heuristique alternative pour alt, probabilité de gain pour
+mcts ; null pour les coups aléatoires et les moteurs sans évaluation.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from mancala import Game, Play, PlayAlt, MAX, MIN
+from mancala_backends import BACKENDS
+from mancala_cache import SymmetricCache
+from mancala_mcts import PlayMCTS
+from mancala_memory import MemoryBudget, MB
+from mancala_tt import SharedTranspositionTable
+
+
+# ==============================
+# Joueur aléatoire (référence)
+# ==============================
+class RandomPlay:
+
+    def __init__(self, game, player, rng=None):
+        self.game = game
+        self.player = player
+        self.rng = rng or random.Random()
+
+    def getComputerMove(self):
+        moves = self.game.state.possibleMoves(self.game.playerSide[self.player])
+        return self.rng.choice(moves)
+
+
+# Moteurs disponibles : nom -> constructeur(game, player)
+ENGINES = {
+    'minimax': lambda game, player: Play(game, player),
+    'alt': lambda game, player: PlayAlt(game, player),
+    'random': lambda game, player: RandomPlay(game, player),
+    'mcts': lambda game, player: PlayMCTS(game, player),
+}
+
+
+def makeEngine(name, game, player):
+    # Fabrique passée directement (ex. moteurs paramétrés de mancala_tuning.py)
+    if callable(name):
+        return name(game, player)
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine: {name} (choose from {', '.join(ENGINES)})")
+    return ENGINES[name](game, player)
+
+
+# Jouer une partie complète (les tours supplémentaires sont respectés)
+def playGame(engine1='minimax', engine2='alt', first='player2', randomPlies=0, rng=None,
+             boardClass=None):
+    """Joue une partie et retourne son enregistrement.
+
+    `engine1` joue player1 (MAX), `engine2` joue player2 (MIN). Les
+    `randomPlies` premiers coups sont tirés au hasard pour varier les
+    ouvertures. `boardClass` choisit la représentation du plateau (voir
+    mancala_backends.py).
+    """
+    rng = rng or random.Random()
+    game = Game(boardClass)
+    engines = {
+        'player1': makeEngine(engine1, game, MAX),
+        'player2': makeEngine(engine2, game, MIN),
+    }
+    side = first
+    moves = []
+    times = []
+    scores = []
+    think = {'player1': 0.0, 'player2': 0.0}
+
+    while not game.gameOver():
+        elapsed = 0.0
+        score = None
+        if len(moves) < randomPlies:
+            pit = rng.choice(game.state.possibleMoves(side))
+        else:
+            start = time.perf_counter()
+            pit = engines[side].getComputerMove()
+            elapsed = time.perf_counter() - start
+            think[side] += elapsed
+            score = getattr(engines[side], 'lastScore', None)
+        moves.append([side, pit])
+        times.append(round(elapsed, 6))
+        scores.append(score)
+        extra_turn = game.state.doMove(side, pit)
+        if not extra_turn:
+            side = 'player1' if side == 'player2' else 'player2'
+
+    for engine in engines.values():
+        if hasattr(engine, 'close'):
+            engine.close()
+
+    return {
+        'players': [str(engine1), str(engine2)],
+        'first': first,
+        'moves': moves,
+        'times': times,
+        'scores': scores,
+        'store1': game.state.board[1],
+        'store2': game.state.board[2],
+        'time1': round(think['player1'], 4),
+        'time2': round(think['player2'], 4),
+    }
+
+
+# Rejouer un enregistrement coup par coup
+def replay(record):
+    """Génère (game, side, pit, extra_turn) pour chaque coup de la partie.
+
+    `game` est l'état AVANT le coup ; il est réutilisé d'un coup à l'autre,
+    il faut donc le copier (game.clone()) pour le conserver.
+    """
+    game = Game()
+    for side, pit in record['moves']:
+        before = game.clone()
+        extra_turn = game.state.doMove(side, pit)
+        yield before, side, pit, extra_turn
+        game.gameOver()
+
+
+def readRecords(stream):
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+# Moteurs paramétrés par la ligne de commande (aussi appelé dans chaque
+# processus de --jobs, où les lambdas ne peuvent pas être transmises)
+def configureEngines(options, tt=None):
+    margins = None
+    if options['margins']:
+        with open(options['margins']) as f:
+            margins = json.load(f)
+    size = options['cache_size']
+    cache = SymmetricCache(size) if size > 0 else None
+    budget = MemoryBudget(int(options['memory_mb'] * MB)) if options['memory_mb'] else None
+    ENGINES['minimax'] = lambda game, player: Play(
+        game, player, depth=options['depth'], futility=options['futility'],
+        probcut=options['probcut'], margins=margins, cache=cache, tt=tt,
+        latencyTarget=options['latency'] / 1000.0 if options['latency'] else None,
+        memoryBudget=budget
+    )
+
+    ENGINES['mcts'] = lambda game, player: PlayMCTS(
+        game, player, iterations=options['mcts_iterations'], timeLimit=options['mcts_time'],
+        playout=options['mcts_playout'], workers=options['mcts_workers'], memoryBudget=budget
+    )
+    if options['alt_weights']:
+        from mancala_tuning import loadWeights
+        alt_weights = loadWeights(options['alt_weights'])
+        ENGINES['alt'] = lambda game, player: PlayAlt(game, player, weights=alt_weights)
+    if options['weights']:
+        from mancala_eval import LearnedEvaluator
+        evaluator = LearnedEvaluator.load(options['weights'])
+        ENGINES['learned'] = lambda game, player: Play(game, player, evaluator=evaluator)
+    return cache
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless Mancala matches")
+    parser.add_argument('--player1', default='minimax')
+    parser.add_argument('--player2', default='alt')
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--random-plies', type=int, default=0,
+                        help="random opening moves per game")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--out', default=None, help="write game records (JSON lines)")
+    parser.add_argument('--weights', default=None,
+                        help="model for the 'learned' engine (see mancala_eval.py)")
+    parser.add_argument('--alt-weights', default=None,
+                        help="evaluateAlt weights for the 'alt' engine (see mancala_tuning.py)")
+    parser.add_argument('--mcts-iterations', type=int, default=2000)
+    parser.add_argument('--mcts-time', type=float, default=None,
+                        help="MCTS time budget per move (seconds)")
+    parser.add_argument('--mcts-workers', type=int, default=1)
+    parser.add_argument('--mcts-playout', choices=('random', 'heavy'), default='random')
+    parser.add_argument('--depth', type=int, default=5, help="search depth of the 'minimax' engine")
+    parser.add_argument('--futility', action='store_true',
+                        help="enable futility pruning in the 'minimax' engine")
+    parser.add_argument('--probcut', action='store_true',
+                        help="enable ProbCut in the 'minimax' engine")
+    parser.add_argument('--margins', default=None,
+                        help="pruning margins (JSON, see mancala_calibrate.py)")
+    parser.add_argument('--cache-size', type=int, default=0,
+                        help="root results shared by both 'minimax' sides (0 disables)")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='dict',
+                        help="board representation (see mancala_backends.py)")
+    parser.add_argument('--latency', type=float, default=None,
+                        help="per-move latency target of the 'minimax' engine (ms, adaptive depth)")
+    parser.add_argument('--memory-mb', type=float, default=None,
+                        help="memory budget per process for 'minimax' and 'mcts' (MB)")
+    parser.add_argument('--jobs', type=int, default=1, help="games played in parallel")
+    parser.add_argument('--tt-entries', type=int, default=0,
+                        help="shared transposition table for the 'minimax' engine (0 disables)")
+    parser.add_argument('--tt-file', default=None,
+                        help="load the transposition table from / save it to this file")
+    args = parser.parse_args(argv)
+
+    tt = None
+    if args.tt_entries > 0:
+        # Les parties en cours (jusqu'à --jobs) gardent leurs entrées profondes
+        tt = SharedTranspositionTable(args.tt_entries, path=args.tt_file,
+                                      ageWindow=max(1, args.jobs))
+    options = vars(args)
+    cache = configureEngines(options, tt)
+    for name in (args.player1, args.player2):
+        if name not in ENGINES:
+            parser.error(f"unknown engine {name!r} (choose from {', '.join(sorted(ENGINES))})")
+
+    # Une graine par partie : mêmes parties quel que soit --jobs
+    rng = random.Random(args.seed)
+    seeds = [rng.getrandbits(32) for _ in range(args.games)]
+    out = open(args.out, 'w') if args.out else None
+    wins = {'player1': 0, 'player2': 0, 'draw': 0}
+    think = {'player1': 0.0, 'player2': 0.0}
+    executor = None
+    if args.jobs > 1:
+        executor = ProcessPoolExecutor(args.jobs, initializer=configureEngines,
+                                       initargs=(options, tt))
+
+    try:
+        records = (executor.map if executor else map)(
+            playGame, repeat(args.player1), repeat(args.player2), repeat('player2'),
+            repeat(args.random_plies), (random.Random(seed) for seed in seeds),
+            repeat(BACKENDS[args.backend])
+        )
+        for i, record in enumerate(records):
+            if tt is not None:
+                tt.newSearch()  # une génération par partie terminée
+            if record['store1'] > record['store2']:
+                wins['player1'] += 1
+            elif record['store2'] > record['store1']:
+                wins['player2'] += 1
+            else:
+                wins['draw'] += 1
+            think['player1'] += record['time1']
+            think['player2'] += record['time2']
+            if out:
+                out.write(json.dumps(record) + "\n")
+            print(f"Game {i + 1}: {record['store1']} - {record['store2']}", file=sys.stderr)
+    finally:
+        if out:
+            out.close()
+        if executor:
+            executor.shutdown()
+        if tt is not None:
+            print(f"Transposition table: {tt.usage():.1%} of {tt.entries} entries used",
+                  file=sys.stderr)
+            if args.tt_file:
+                tt.save(args.tt_file)
+            tt.close()
+            tt.unlink()
+
+    print(f"{args.player1} (player1): {wins['player1']}  "
+          f"{args.player2} (player2): {wins['player2']}  draws: {wins['draw']}")
+    print(f"Thinking time: player1 {think['player1']:.2f}s  player2 {think['player2']:.2f}s")
+    if cache is not None and executor is None:
+        print(f"Symmetric cache: {len(cache)} positions, hit rate {cache.hitRate():.1%} "
+              f"({cache.stats['mirrorHits']} mirrored)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""Moteur Monte Carlo Tree Search (UCT), alternative à l'alpha-beta.
+
+Contrairement à la recherche minimax, le camp qui joue est suivi dans
+chaque noeud : un coup qui finit dans son propre store redonne la main au
+même joueur. Les récompenses sont exprimées du point de vue de player1
+(1 = victoire, 0.5 = nul, 0 = défaite).
+"""
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from mancala import BOARD_KEYS, MAX, STORE_DISTANCE
+from mancala_memory import MCTS_NODE_BYTES
+
+
+def otherSide(side):
+    return 'player1' if side == 'player2' else 'player2'
+
+
+def reward(game):
+    s1 = game.state.board[1]
+    s2 = game.state.board[2]
+    if s1 > s2:
+        return 1.0
+    if s2 > s1:
+        return 0.0
+    return 0.5
+
+
+class Node:
+    __slots__ = ('game', 'side', 'parent', 'pit', 'children', 'untried',
+                 'visits', 'wins', 'terminal')
+
+    def __init__(self, game, side, parent=None, pit=None):
+        self.game = game
+        self.side = side            # camp qui doit jouer dans ce noeud
+        self.parent = parent
+        self.pit = pit              # coup qui a mené à ce noeud
+        self.children = {}
+        self.terminal = game.gameOver()
+        self.untried = [] if self.terminal else game.state.possibleMoves(side)
+        self.visits = 0
+        self.wins = 0.0             # somme des récompenses de player1
+
+    def key(self):
+        return tuple(self.game.state.board[k] for k in BOARD_KEYS), self.side
+
+
+class PlayMCTS:
+    """Joueur MCTS avec la même interface que Play / PlayAlt.
+
+    Le budget est un nombre d'itérations et/ou un temps (secondes). Avec
+    `workers > 1`, la recherche est parallélisée à la racine : chaque
+    processus construit son propre arbre et les visites sont additionnées.
+
+    Avec un `memoryBudget` (mancala_memory.MemoryBudget), l'arbre conservé
+    d'un coup à l'autre est abandonné si le budget est dépassé, et l'arbre
+    cesse de grandir (les itérations continuent par simulations depuis les
+    feuilles) quand il atteint la part souple du budget. Le budget ne
+    couvre que la recherche dans ce processus (workers=1).
+    """
+
+    def __init__(self, game, player=MAX, iterations=2000, timeLimit=None,
+                 playout='random', workers=1, exploration=1.4, reuseDepth=4, seed=None,
+                 memoryBudget=None):
+        if playout not in ('random', 'heavy'):
+            raise ValueError(f"Unknown playout policy: {playout}")
+        self.game = game
+        self.player = player
+        self.iterations = iterations
+        self.timeLimit = timeLimit
+        self.playout = playout
+        self.workers = workers
+        self.exploration = exploration
+        self.reuseDepth = reuseDepth
+        self.rng = random.Random(seed)
+        self.root = None
+        self.executor = None
+        self.lastStats = {}
+        self.lastScore = None  # Taux de gain de player1 estimé pour le coup choisi
+        self.treeNodes = 0
+        self.frozen = False  # Plus d'expansion : budget mémoire atteint
+        self.memoryBudget = memoryBudget
+        self.memoryName = None
+        if memoryBudget is not None:
+            self.memoryName = f"mcts-{id(self)}"
+            memoryBudget.register(self.memoryName, lambda: self.treeNodes * MCTS_NODE_BYTES,
+                                  self._dropTree)
+
+    def getComputerMove(self):
+        side = self.game.playerSide[self.player]
+        start = time.perf_counter()
+
+        if self.memoryBudget is not None:
+            self.memoryBudget.beginSearch()
+            self.memoryBudget.enforce()
+
+        if self.workers > 1:
+            stats, iterations = self._searchParallel(side)
+            reused = 0
+        else:
+            root = self._reuseRoot(side)
+            self.treeNodes = root.visits + 1
+            self.frozen = False
+            reused = root.visits
+            iterations = self._search(root)
+            stats = {pit: (c.visits, c.wins) for pit, c in root.children.items()}
+            self.root = root
+
+        pit = max(stats, key=lambda p: stats[p][0])
+        visits, wins = stats[pit]
+        self.lastScore = wins / visits if visits else None
+        self.lastStats = {
+            'iterations': iterations,
+            'reused': reused,
+            'time': time.perf_counter() - start,
+            'visits': {p: v for p, (v, _) in stats.items()},
+        }
+        if self.memoryBudget is not None:
+            self.memoryBudget.sample()
+            self.lastStats['peakMemory'] = self.memoryBudget.peak
+            self.lastStats['frozen'] = self.frozen
+        return pit
+
+    # Libérer l'arbre conservé (appelé par le budget mémoire)
+    def _dropTree(self, fraction):
+        self.root = None
+        self.treeNodes = 0
+
+    # Réutiliser le sous-arbre qui correspond à la position actuelle
+    def _reuseRoot(self, side):
+        key = tuple(self.game.state.board[k] for k in BOARD_KEYS), side
+        frontier = [self.root] if self.root is not None else []
+        for _ in range(self.reuseDepth + 1):
+            next_frontier = []
+            for node in frontier:
+                if node.key() == key:
+                    node.parent = None
+                    return node
+                next_frontier.extend(node.children.values())
+            frontier = next_frontier
+        return Node(self.game.clone(), side)
+
+    def _search(self, root):
+        deadline = time.perf_counter() + self.timeLimit if self.timeLimit else None
+        done = 0
+        while self.iterations is None or done < self.iterations:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            self._iterate(root)
+            done += 1
+            if self.memoryBudget is not None and not done & 255 and not self.frozen:
+                budget = self.memoryBudget
+                self.frozen = budget.usage() > budget.limit * budget.soft
+                budget.sample()
+            if root.terminal:
+                break
+        return done
+
+    def _iterate(self, root):
+        node = root
+        # Sélection
+        while not node.untried and node.children:
+            node = self._select(node)
+        # Expansion
+        if node.untried and not self.frozen:
+            pit = node.untried.pop(self.rng.randrange(len(node.untried)))
+            child_game = node.game.clone()
+            extra_turn = child_game.state.doMove(node.side, pit)
+            side = node.side if extra_turn else otherSide(node.side)
+            child = Node(child_game, side, node, pit)
+            node.children[pit] = child
+            self.treeNodes += 1
+            node = child
+        # Simulation
+        result = self._playout(node)
+        # Rétropropagation
+        while node is not None:
+            node.visits += 1
+            node.wins += result
+            node = node.parent
+
+    def _select(self, node):
+        log_n = math.log(node.visits)
+        best, best_score = None, -math.inf
+        for child in node.children.values():
+            q = child.wins / child.visits
+            if node.side == 'player2':
+                q = 1.0 - q
+            score = q + self.exploration * math.sqrt(log_n / child.visits)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+    def _playout(self, node):
+        if node.terminal:
+            return reward(node.game)
+        game = node.game.clone()
+        board = game.state.board
+        side = node.side
+        rng = self.rng
+        heavy = self.playout == 'heavy'
+        while not game.gameOver():
+            moves = game.state.possibleMoves(side)
+            pit = None
+            if heavy and game.state.readyPits[1 if side == 'player1' else 2]:
+                # Privilégier les coups qui finissent dans le store (tour supplémentaire)
+                for p in moves:
+                    if board[p] == STORE_DISTANCE[p]:
+                        pit = p
+                        break
+            if pit is None:
+                pit = moves[rng.randrange(len(moves))]
+            if not game.state.doMove(side, pit):
+                side = otherSide(side)
+        return reward(game)
+
+    # Parallélisation à la racine sur plusieurs processus
+    def _searchParallel(self, side):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        iterations = None
+        if self.iterations is not None:
+            iterations = -(-self.iterations // self.workers)
+        futures = [
+            self.executor.submit(
+                _searchWorker, self.game.clone(), self.player, side, iterations,
+                self.timeLimit, self.playout, self.exploration, self.rng.getrandbits(32)
+            )
+            for _ in range(self.workers)
+        ]
+        stats = {}
+        total = 0
+        for future in futures:
+            worker_stats, done = future.result()
+            total += done
+            for pit, (visits, wins) in worker_stats.items():
+                v, w = stats.get(pit, (0, 0.0))
+                stats[pit] = (v + visits, w + wins)
+        return stats, total
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        # Le budget est partagé entre les parties : ne plus compter cet arbre
+        if self.memoryName is not None:
+            self.memoryBudget.unregister(self.memoryName)
+            self.memoryName = None
+        self._dropTree(1.0)
+
+
+def _searchWorker(game, player, side, iterations, timeLimit, playout, exploration, seed):
+    engine = PlayMCTS(game, player, iterations=iterations, timeLimit=timeLimit,
+                      playout=playout, exploration=exploration, seed=seed)
+    root = Node(game, side)
+    done = engine._search(root)
+    return {pit: (c.visits, c.wins) for pit, c in root.children.items()}, done
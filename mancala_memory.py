@@ -0,0 +1,107 @@
+"""Budget mémoire des moteurs : suivi, réduction des caches, dégradation.
+
+Chaque structure qui grossit (cache symétrique, table de transposition,
+arbre MCTS...) s'enregistre avec une fonction qui estime sa taille et, si
+possible, une fonction qui la réduit. Avant chaque recherche :
+
+1. si l'usage estimé dépasse la part « souple » du budget, les composants
+   réductibles sont réduits de moitié, les plus gros d'abord ;
+2. si cela ne suffit pas, la profondeur de recherche est abaissée au lieu
+   de risquer un arrêt par manque de mémoire.
+
+La mémoire réelle du processus (RSS) est échantillonnée pendant la
+recherche pour en donner le pic (`peak`).
+
+    budget = MemoryBudget(256 * MB)
+    play = Play(game, MAX, cache=cache, tt=tt, memoryBudget=budget)
+"""
+import os
+
+MB = 1024 * 1024
+
+# Tailles moyennes mesurées (tracemalloc, CPython 3.11)
+CACHE_ENTRY_BYTES = 600      # entrée de SymmetricCache (clé + résultat + LRU)
+MCTS_NODE_BYTES = 1500       # noeud MCTS avec sa copie de la partie
+
+
+def currentRss():
+    """Mémoire résidente du processus (octets)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # Hors Linux : à défaut, le pic depuis le démarrage
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class MemoryBudget:
+
+    def __init__(self, limit, soft=0.8):
+        self.limit = limit
+        self.soft = soft
+        self.components = {}
+        self.refs = {}  # nom -> nombre d'enregistrements (cache partagé par deux moteurs)
+        self.peak = 0
+        self.stats = {'shrinks': 0, 'degradedSearches': 0}
+
+    def register(self, name, size, shrink=None):
+        """`size()` -> octets estimés ; `shrink(fraction)` libère cette fraction.
+
+        Chaque register doit être suivi d'un unregister (fin de partie) : un
+        composant enregistré sous le même nom par plusieurs moteurs reste
+        suivi jusqu'au dernier.
+        """
+        self.components[name] = (size, shrink)
+        self.refs[name] = self.refs.get(name, 0) + 1
+
+    def unregister(self, name):
+        count = self.refs.get(name, 0) - 1
+        if count > 0:
+            self.refs[name] = count
+        else:
+            self.refs.pop(name, None)
+            self.components.pop(name, None)
+
+    def usage(self):
+        return sum(size() for size, _ in self.components.values())
+
+    def sample(self):
+        rss = currentRss()
+        if rss > self.peak:
+            self.peak = rss
+        return rss
+
+    def beginSearch(self):
+        self.peak = 0
+        self.sample()
+
+    def enforce(self):
+        """Réduire les caches si besoin ; rend la baisse de profondeur conseillée"""
+        target = self.limit * self.soft
+        used = self.usage()
+        if used <= target:
+            return 0
+        by_size = sorted(self.components.values(), key=lambda c: c[0](), reverse=True)
+        for size, shrink in by_size:
+            if shrink is None or not size():
+                continue
+            shrink(0.5)
+            self.stats['shrinks'] += 1
+            used = self.usage()
+            if used <= target:
+                return 0
+        # Les structures fixes (ex. table de transposition) dépassent encore
+        self.stats['degradedSearches'] += 1
+        return 1 if used <= self.limit else 2
+
+    def report(self):
+        return dict(
+            self.stats,
+            limit=self.limit,
+            estimated=self.usage(),
+            peakRss=self.peak,
+            components={name: size() for name, (size, _) in self.components.items()},
+        )
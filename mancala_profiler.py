@@ -0,0 +1,137 @@
+"""Mesure des temps par section et histogrammes de latence.
+
+Ce module n'utilise pas pygame : il sert au profilage de l'interface
+(temps de chaque phase de dessin par image) comme aux mesures du moteur.
+"""
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Bornes des classes (ms) de l'histogramme des temps d'image ; 16.7 ms = 60 FPS
+FRAME_BUCKETS = (4, 8, 12, 16.7, 20, 33.3, 50, 100)
+# Bornes (ms) de l'histogramme des temps de réflexion par coup
+MOVE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+
+
+class LatencyHistogram:
+    """Histogramme à classes fixes + fenêtre glissante pour les percentiles."""
+
+    def __init__(self, edges=FRAME_BUCKETS, window=600):
+        self.edges = tuple(edges)
+        self.counts = [0] * (len(self.edges) + 1)
+        self.samples = deque(maxlen=window)
+        self.total = 0
+
+    def add(self, value):
+        i = 0
+        while i < len(self.edges) and value >= self.edges[i]:
+            i += 1
+        self.counts[i] += 1
+        self.samples.append(value)
+        self.total += 1
+
+    def percentile(self, p):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def mean(self):
+        return sum(self.samples) / len(self.samples) if self.samples else 0.0
+
+    def labels(self):
+        bounds = ('0',) + tuple(f"{e:g}" for e in self.edges)
+        return [f"{lo}-{hi}" for lo, hi in zip(bounds, bounds[1:])] + [f">={self.edges[-1]:g}"]
+
+    def toDict(self):
+        return {
+            'count': self.total,
+            'mean': round(self.mean(), 3),
+            'p50': round(self.percentile(50), 3),
+            'p95': round(self.percentile(95), 3),
+            'p99': round(self.percentile(99), 3),
+            'max': round(max(self.samples), 3) if self.samples else 0.0,
+            'buckets': dict(zip(self.labels(), self.counts)),
+        }
+
+
+class FrameProfiler:
+    """Temps par section (ms) cumulés sur chaque image.
+
+    Les sections peuvent être imbriquées (draw_pit dans draw_board) : chaque
+    section mesure son temps inclusif. Avec `dumpPath`, un résumé est ajouté
+    au fichier (une ligne JSON) toutes les `dumpInterval` secondes.
+
+    Les sections ne concernent que le thread principal. Une durée mesurée
+    ailleurs (ex. recherche de l'IA sur un thread de fond) est transmise par
+    `record`, appelé depuis le thread principal, et n'est rattachée à
+    aucune image.
+    """
+
+    def __init__(self, window=600, dumpPath=None, dumpInterval=5.0):
+        self.window = window
+        self.frameTimes = LatencyHistogram(FRAME_BUCKETS, window)
+        self.sections = {}
+        self.current = {}
+        self.events = {}  # nom -> LatencyHistogram (ms), hors images
+        self.frameStart = None
+        self.dumpPath = dumpPath
+        self.dumpInterval = dumpInterval
+        self.lastDump = time.perf_counter()
+
+    @contextmanager
+    def section(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000.0
+            self.current[name] = self.current.get(name, 0.0) + elapsed
+
+    def record(self, name, elapsed):
+        """Durée (ms) d'un événement hors image"""
+        if name not in self.events:
+            self.events[name] = LatencyHistogram(MOVE_BUCKETS, self.window)
+        self.events[name].add(elapsed)
+
+    def beginFrame(self):
+        self.frameStart = time.perf_counter()
+        self.current = {}
+
+    def endFrame(self):
+        if self.frameStart is None:
+            return
+        now = time.perf_counter()
+        self.frameTimes.add((now - self.frameStart) * 1000.0)
+        for name, elapsed in self.current.items():
+            if name not in self.sections:
+                self.sections[name] = deque(maxlen=self.window)
+            self.sections[name].append(elapsed)
+        if self.dumpPath and now - self.lastDump >= self.dumpInterval:
+            self.dump()
+            self.lastDump = now
+
+    def sectionStats(self):
+        stats = {}
+        for name, samples in self.sections.items():
+            ordered = sorted(samples)
+            stats[name] = {
+                'mean': round(sum(ordered) / len(ordered), 3),
+                'p95': round(ordered[int(0.95 * (len(ordered) - 1))], 3),
+                'max': round(ordered[-1], 3),
+            }
+        return stats
+
+    def summary(self):
+        return {
+            'time': time.time(),
+            'frames': self.frameTimes.toDict(),
+            'sections': self.sectionStats(),
+            'events': {name: hist.toDict() for name, hist in self.events.items()},
+        }
+
+    def dump(self):
+        with open(self.dumpPath, 'a') as f:
+            f.write(json.dumps(self.summary()) + "\n")
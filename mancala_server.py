@@ -0,0 +1,219 @@
+"""Service HTTP/JSON local qui calcule le meilleur coup.
+
+Plusieurs interfaces peuvent ainsi partager un moteur déjà chaud au lieu
+de démarrer chacune à froid :
+
+    python mancala_server.py --port 8765 --workers 4
+
+    POST /move   {"board": [4, 4, 4, 4, 4, 4, 0, 4, 4, 4, 4, 4, 4, 0],
+                  "side": "player1", "depth": 5}
+    ->           {"move": "C", "score": 2, "nodes": 1234, "time": 0.05,
+                  "cached": false}
+    GET  /stats  compteurs du cache et des recherches
+
+Le plateau suit l'ordre BOARD_KEYS (A-F, store 1, G-L, store 2). Les
+recherches tournent dans un pool de processus ; les requêtes identiques
+en cours de calcul sont fusionnées et les réponses récentes gardées dans
+un cache LRU. Une position et sa position miroir (camps échangés)
+partagent la même entrée (voir mancala_cache.py).
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from mancala import Game, Play, MAX, MIN
+from mancala_backends import TOTAL_SEEDS
+from mancala_cache import SymmetricCache, canonical, mirrorResult
+from mancala_memory import MemoryBudget, MB
+
+MAX_DEPTH = 12
+MAX_BODY = 64 * 1024
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error'}
+
+
+# Recherche exécutée dans un processus du pool
+def analysePosition(counts, side, depth):
+    game = Game.fromCounts(counts)
+    play = Play(game, MAX if side == 'player1' else MIN, depth=depth)
+    start = time.perf_counter()
+    score, pit = play.search()
+    return {
+        'move': pit,
+        'score': score,
+        'nodes': play.nodes,
+        'time': round(time.perf_counter() - start, 6),
+    }
+
+
+class MoveService:
+
+    def __init__(self, workers=None, cacheSize=10000, memoryLimit=None, maxSeeds=TOTAL_SEEDS):
+        self.maxSeeds = maxSeeds  # Graines au plus sur le plateau (borne le coût d'un semis)
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.cache = SymmetricCache(cacheSize)
+        # Budget mémoire du cache (le cache est réduit de moitié s'il le dépasse)
+        self.memory = None
+        if memoryLimit:
+            self.memory = MemoryBudget(memoryLimit)
+            self.memory.register('cache', self.cache.memoryUsage, self.cache.shrink)
+        self.inflight = {}
+        self.stats = {'requests': 0, 'hits': 0, 'mirror_hits': 0, 'coalesced': 0, 'searches': 0}
+
+    def parseRequest(self, payload):
+        counts = payload.get('board')
+        side = payload.get('side')
+        depth = payload.get('depth', 5)
+        if side not in ('player1', 'player2'):
+            raise ValueError("'side' must be 'player1' or 'player2'")
+        if not isinstance(depth, int) or not 2 <= depth <= MAX_DEPTH:
+            raise ValueError(f"'depth' must be an integer between 2 and {MAX_DEPTH}")
+        if not isinstance(counts, list):
+            raise ValueError("'board' must be a list of 14 counts")
+        game = Game.fromCounts(counts)  # valide les compteurs
+        if sum(counts) > self.maxSeeds:
+            raise ValueError(f"'board' holds more than {self.maxSeeds} seeds")
+        if game.gameOver():
+            raise ValueError("The game is already over in this position")
+        return tuple(counts), side, depth
+
+    async def bestMove(self, counts, side, depth):
+        self.stats['requests'] += 1
+
+        result = self.cache.get(counts, side, depth)
+        if result is not None:
+            self.stats['hits'] += 1
+            if side == 'player2':
+                self.stats['mirror_hits'] += 1
+            return dict(result, cached=True)
+
+        # Les recherches se font toujours sur la forme canonique (player1 au
+        # trait) : une position et son miroir ne sont calculées qu'une fois
+        key, flipped = canonical(counts, side)
+        key = (key, depth)
+
+        # Une recherche identique est déjà en cours : attendre son résultat
+        if key in self.inflight:
+            self.stats['coalesced'] += 1
+            result = await asyncio.shield(self.inflight[key])
+            return dict(mirrorResult(result) if flipped else result, cached=True)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, analysePosition, key[0], 'player1', depth)
+        self.inflight[key] = future
+        self.stats['searches'] += 1
+        try:
+            result = await future
+        finally:
+            del self.inflight[key]
+
+        self.cache.put(key[0], 'player1', depth, result)
+        if self.memory is not None:
+            self.memory.enforce()
+        return dict(mirrorResult(result) if flipped else result, cached=False)
+
+    async def handle(self, reader, writer):
+        try:
+            status, body = await self.route(reader)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        except Exception as e:
+            # Échec de la recherche (ex. BrokenProcessPool) : répondre quand même
+            status, body = 500, {'error': f"Search failed: {type(e).__name__}: {e}"}
+        data = json.dumps(body).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: close\r\n\r\n".encode() + data
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def route(self, reader):
+        request_line = (await reader.readline()).decode('latin-1').split()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if len(request_line) < 2:
+            return 400, {'error': "Malformed request line"}
+        method, path = request_line[0], request_line[1]
+
+        if path == '/stats':
+            if method != 'GET':
+                return 405, {'error': "Use GET"}
+            stats = dict(self.stats, cached_positions=len(self.cache),
+                         inflight=len(self.inflight))
+            if self.memory is not None:
+                self.memory.sample()
+                stats['memory'] = self.memory.report()
+            return 200, stats
+
+        if path != '/move':
+            return 404, {'error': f"Unknown path {path}"}
+        if method != 'POST':
+            return 405, {'error': "Use POST"}
+
+        try:
+            length = int(headers.get('content-length', 0) or 0)
+        except ValueError:
+            length = 0
+        if length <= 0 or length > MAX_BODY:
+            return 400, {'error': "Missing or oversized body"}
+        try:
+            payload = json.loads(await reader.readexactly(length))
+            if not isinstance(payload, dict):
+                raise ValueError("Body must be a JSON object")
+            counts, side, depth = self.parseRequest(payload)
+        except ValueError as e:
+            return 400, {'error': str(e)}
+
+        return 200, await self.bestMove(counts, side, depth)
+
+    def close(self):
+        self.executor.shutdown()
+
+
+async def serve(host, port, workers, cacheSize, memoryLimit=None, maxSeeds=TOTAL_SEEDS):
+    service = MoveService(workers, cacheSize, memoryLimit, maxSeeds)
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"Mancala move service listening on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local Mancala move service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cache-size', type=int, default=10000)
+    parser.add_argument('--memory-mb', type=float, default=None,
+                        help="memory budget of the result cache (MB)")
+    parser.add_argument('--max-seeds', type=int, default=TOTAL_SEEDS,
+                        help="reject boards holding more seeds than this")
+    args = parser.parse_args(argv)
+    memory = int(args.memory_mb * MB) if args.memory_mb else None
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.cache_size, memory,
+                          args.max_seeds))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""Gestion asynchrone de nombreuses parties simultanées dans un seul processus.
+
+Chaque session ne garde que l'essentiel : le plateau compacté dans un
+entier (voir mancala_backends.PackedBoard), le camp qui doit jouer et
+quelques compteurs. Les coups de l'ordinateur sont calculés dans un pool
+de processus ; un sémaphore borne le nombre de recherches en cours. Les
+sessions inactives sont écrites sur disque puis rechargées à la demande.
+
+    manager = SessionManager(workers=4, maxInflight=8, idleTimeout=300)
+    sid = manager.create()
+    state = await manager.play(sid, 'H')     # coup humain + réponse(s) de l'ordinateur
+
+    python mancala_sessions.py --sessions 2000 --workers 4   # charge simulée
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from mancala import Game, Play, MAX, MIN
+from mancala_backends import PackedBoard, INITIAL_PACKED, unpackCounts
+from mancala_mcts import otherSide
+from mancala_profiler import LatencyHistogram, MOVE_BUCKETS
+
+
+def gameFromPacked(packed):
+    game = Game(PackedBoard)
+    game.state.packed = packed
+    return game
+
+
+# Recherche exécutée dans un processus du pool
+def computeMove(packed, side, depth):
+    play = Play(gameFromPacked(packed), MAX if side == 'player1' else MIN, depth=depth)
+    _, pit = play.search()
+    return pit
+
+
+class Session:
+    __slots__ = ('id', 'packed', 'side', 'human', 'depth', 'over', 'created',
+                 'lastActive', 'moves', 'aiMoves', 'aiTime', 'lock')
+
+    def __init__(self, sid, human='player2', depth=5, first='player2'):
+        self.id = sid
+        self.packed = INITIAL_PACKED
+        self.side = first            # camp qui doit jouer
+        self.human = human
+        self.depth = depth
+        self.over = False
+        self.created = self.lastActive = time.time()
+        self.moves = 0
+        self.aiMoves = 0
+        self.aiTime = 0.0
+        self.lock = asyncio.Lock()   # un seul coup à la fois par session
+
+    def toDict(self):
+        return {name: getattr(self, name) for name in self.__slots__ if name != 'lock'}
+
+    @classmethod
+    def fromDict(cls, data):
+        session = cls.__new__(cls)
+        for name, value in data.items():
+            setattr(session, name, value)
+        session.lock = asyncio.Lock()
+        return session
+
+    def view(self):
+        """État présentable au client"""
+        return {
+            'id': self.id,
+            'board': list(unpackCounts(self.packed)),
+            'side': self.side,
+            'over': self.over,
+            'moves': self.moves,
+        }
+
+    def stats(self):
+        age = max(time.time() - self.created, 1e-9)
+        return {
+            'moves': self.moves,
+            'ai_moves': self.aiMoves,
+            'ai_time': round(self.aiTime, 6),
+            'moves_per_second': round(self.moves / age, 3),
+        }
+
+
+class SessionManager:
+
+    def __init__(self, workers=None, maxInflight=None, idleTimeout=300.0, spillDir=None):
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.inflight = asyncio.Semaphore(maxInflight or (workers or os.cpu_count() or 1) * 2)
+        self.idleTimeout = idleTimeout
+        # Répertoire temporaire par défaut : supprimé par shutdown()
+        self.ownSpillDir = spillDir is None
+        self.spillDir = spillDir or tempfile.mkdtemp(prefix="mancala-sessions-")
+        os.makedirs(self.spillDir, exist_ok=True)
+        self.sessions = {}
+        self.evicted = set()
+        self.started = time.time()
+        self.searchLatency = LatencyHistogram(MOVE_BUCKETS, window=10000)  # ms
+        self.stats = {'created': 0, 'moves': 0, 'ai_moves': 0, 'evicted': 0,
+                      'restored': 0, 'searching': 0, 'finished': 0}
+
+    def create(self, human='player2', depth=5, first='player2'):
+        if human not in ('player1', 'player2') or first not in ('player1', 'player2'):
+            raise ValueError("sides must be 'player1' or 'player2'")
+        sid = uuid.uuid4().hex
+        self.sessions[sid] = Session(sid, human, depth, first)
+        self.stats['created'] += 1
+        return sid
+
+    def _path(self, sid):
+        return os.path.join(self.spillDir, f"{sid}.json")
+
+    def get(self, sid):
+        session = self.sessions.get(sid)
+        if session is None:
+            if sid not in self.evicted:
+                raise KeyError(f"Unknown session {sid}")
+            with open(self._path(sid)) as f:
+                session = Session.fromDict(json.load(f))
+            os.remove(self._path(sid))
+            self.evicted.discard(sid)
+            self.sessions[sid] = session
+            self.stats['restored'] += 1
+        return session
+
+    def _apply(self, session, pit):
+        game = gameFromPacked(session.packed)
+        extra_turn = game.state.doMove(session.side, pit)
+        session.over = game.gameOver()
+        session.packed = game.state.packed
+        session.moves += 1
+        self.stats['moves'] += 1
+        if session.over:
+            self.stats['finished'] += 1
+        elif not extra_turn:
+            session.side = otherSide(session.side)
+
+    async def play(self, sid, pit=None):
+        """Joue le coup humain `pit` (s'il a le trait), puis les coups de l'ordinateur"""
+        session = self.get(sid)
+        async with session.lock:
+            session.lastActive = time.time()
+            if pit is not None:
+                if session.over or session.side != session.human:
+                    raise ValueError("It is not the human player's turn")
+                legal = gameFromPacked(session.packed).state.possibleMoves(session.side)
+                if pit not in legal:
+                    raise ValueError(f"Illegal move {pit!r} (legal: {', '.join(legal)})")
+                self._apply(session, pit)
+
+            loop = asyncio.get_running_loop()
+            while not session.over and session.side != session.human:
+                async with self.inflight:
+                    self.stats['searching'] += 1
+                    start = time.perf_counter()
+                    try:
+                        ai_pit = await loop.run_in_executor(
+                            self.executor, computeMove, session.packed, session.side, session.depth
+                        )
+                    finally:
+                        self.stats['searching'] -= 1
+                    elapsed = time.perf_counter() - start
+                self.searchLatency.add(elapsed * 1000.0)
+                session.aiTime += elapsed
+                session.aiMoves += 1
+                self.stats['ai_moves'] += 1
+                self._apply(session, ai_pit)
+            session.lastActive = time.time()
+            return session.view()
+
+    def close(self, sid):
+        """Terminer une session (en mémoire ou sur disque)"""
+        if self.sessions.pop(sid, None) is None and sid in self.evicted:
+            self.evicted.discard(sid)
+            os.remove(self._path(sid))
+
+    # Écrire sur disque les sessions inactives depuis idleTimeout
+    def evictIdle(self, now=None):
+        now = now or time.time()
+        count = 0
+        for sid, session in list(self.sessions.items()):
+            if now - session.lastActive < self.idleTimeout or session.lock.locked():
+                continue
+            with open(self._path(sid), 'w') as f:
+                json.dump(session.toDict(), f)
+            del self.sessions[sid]
+            self.evicted.add(sid)
+            count += 1
+        self.stats['evicted'] += count
+        return count
+
+    async def evictLoop(self, interval=None):
+        while True:
+            await asyncio.sleep(interval or max(self.idleTimeout / 4, 1.0))
+            self.evictIdle()
+
+    def sessionStats(self, sid):
+        return self.get(sid).stats()
+
+    def aggregateStats(self):
+        elapsed = max(time.time() - self.started, 1e-9)
+        return dict(
+            self.stats,
+            active=len(self.sessions),
+            on_disk=len(self.evicted),
+            moves_per_second=round(self.stats['moves'] / elapsed, 3),
+            search_ms=self.searchLatency.toDict(),
+        )
+
+    def shutdown(self):
+        self.executor.shutdown()
+        if self.ownSpillDir:
+            shutil.rmtree(self.spillDir, ignore_errors=True)
+
+
+# ==============================
+# Charge simulée
+# ==============================
+async def simulate(manager, sessions, depth, thinkTime, seed):
+    rng = random.Random(seed)
+
+    async def player(index):
+        sid = manager.create(depth=depth, first=rng.choice(('player1', 'player2')))
+        state = await manager.play(sid)
+        while not state['over']:
+            await asyncio.sleep(rng.uniform(0, 2 * thinkTime))
+            legal = gameFromPacked(manager.get(sid).packed).state.possibleMoves('player2')
+            state = await manager.play(sid, rng.choice(legal))
+        manager.close(sid)
+
+    evictor = asyncio.create_task(manager.evictLoop())
+    try:
+        await asyncio.gather(*(player(i) for i in range(sessions)))
+    finally:
+        evictor.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate many concurrent Mancala sessions")
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--max-inflight', type=int, default=None)
+    parser.add_argument('--think', type=float, default=0.05,
+                        help="mean human thinking time (seconds)")
+    parser.add_argument('--idle-timeout', type=float, default=1.0)
+    parser.add_argument('--spill-dir', default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    async def run():
+        manager = SessionManager(args.workers, args.max_inflight, args.idle_timeout, args.spill_dir)
+        try:
+            start = time.perf_counter()
+            await simulate(manager, args.sessions, args.depth, args.think, args.seed)
+            print(f"{args.sessions} games in {time.perf_counter() - start:.2f}s")
+            print(json.dumps(manager.aggregateStats(), indent=2))
+        finally:
+            manager.shutdown()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
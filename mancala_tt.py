@@ -0,0 +1,189 @@
+"""Table de transposition en mémoire partagée entre processus.
+
+La table est un tableau d'entrées de taille fixe dans un segment
+`multiprocessing.shared_memory` : tous les processus de recherche (et les
+parties du tournoi, voir mancala_match.py --jobs) lisent et écrivent les
+mêmes entrées au lieu de garder chacun son cache privé.
+
+    tt = SharedTranspositionTable(1 << 20, path="tt.bin")   # reprise à chaud
+    play = Play(game, MAX, tt=tt)
+    ...
+    tt.newSearch()                                           # partie suivante
+    tt.save("tt.bin"); tt.close(); tt.unlink()
+
+Un objet SharedTranspositionTable peut être passé tel quel à un processus
+(ProcessPoolExecutor) : il s'y rattache au segment par son nom.
+
+Pas de verrou : chaque entrée contient une somme de contrôle (XOR de la clé
+et des données, à la manière de Hyatt). Une entrée déchirée par deux
+écritures concurrentes ne passe pas la vérification et est simplement
+ignorée, ce qui coûte au pire une recherche de plus.
+"""
+import os
+import struct
+from multiprocessing import shared_memory
+
+from mancala import MIN, PITS
+from mancala_backends import packCounts
+
+HEADER = struct.Struct('<4sQI')          # magic, nombre d'entrées, génération
+HEADER_SIZE = 64
+MAGIC = b'MTT1'
+# clé basse, clé haute (+ camp), méta, valeur (virgule fixe), contrôle
+ENTRY = struct.Struct('<QIIqQ')
+MASK64 = (1 << 64) - 1
+VALUE_SCALE = 1 << 16                    # les évaluations apprises ne sont pas entières
+
+PIT_CODE = {pit: i for i, pit in enumerate(PITS)}
+NO_MOVE = 15
+
+# Segments déjà ouverts dans ce processus (un seul attachement par nom)
+_attached = {}
+
+
+def positionKey(game):
+    """Clé entière de la position : l'entier compacté de mancala_backends"""
+    packed = getattr(game.state, 'packed', None)
+    if packed is not None:
+        return packed
+    return packCounts(game.state.toCounts())
+
+
+def packMeta(depth, flag, move, generation):
+    code = NO_MOVE if move is None else PIT_CODE[move]
+    return 1 | (depth & 0xFF) << 1 | flag << 9 | code << 11 | (generation & 0xFF) << 15
+
+
+def unpackMeta(meta):
+    code = (meta >> 11) & 0xF
+    return (meta >> 1) & 0xFF, (meta >> 9) & 0x3, None if code == NO_MOVE else PITS[code], (meta >> 15) & 0xFF
+
+
+class SharedTranspositionTable:
+    """Table de transposition à remplacement « profondeur d'abord ».
+
+    La génération, partagée par tous les processus, est avancée par le
+    propriétaire de la table (newSearch, une fois par partie) et non par
+    chaque recherche : sinon, avec N processus, elle change sans cesse et
+    les entrées profondes de l'un sont écrasées par les entrées peu
+    profondes des autres. Une entrée des `ageWindow` dernières générations
+    (les parties encore en cours, ex. ageWindow = nombre de processus) est
+    gardée si elle est plus profonde ; une entrée plus ancienne est
+    toujours remplaçable.
+    """
+
+    def __init__(self, entries=1 << 20, name=None, path=None, create=True, ageWindow=1):
+        if create:
+            self.shm = shared_memory.SharedMemory(
+                name=name, create=True, size=HEADER_SIZE + entries * ENTRY.size
+            )
+            HEADER.pack_into(self.shm.buf, 0, MAGIC, entries, 0)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        magic, self.entries, _ = HEADER.unpack_from(self.shm.buf, 0)
+        self.name = self.shm.name
+        self.owner = create
+        self.ageWindow = max(1, ageWindow)
+        if magic != MAGIC:
+            self.shm.close()
+            raise ValueError(f"{self.name} is not a transposition table")
+        if create and path and os.path.exists(path):
+            try:
+                self.load(path)
+            except ValueError:
+                self.shm.close()
+                self.shm.unlink()
+                raise
+        self.stats = {'probes': 0, 'hits': 0, 'stores': 0, 'collisions': 0}
+
+    @classmethod
+    def attach(cls, name, ageWindow=1):
+        if name not in _attached:
+            _attached[name] = cls(name=name, create=False, ageWindow=ageWindow)
+        return _attached[name]
+
+    def __reduce__(self):
+        return SharedTranspositionTable.attach, (self.name, self.ageWindow)
+
+    # Génération courante (partagée) : à incrémenter à chaque nouvelle partie
+    @property
+    def generation(self):
+        return HEADER.unpack_from(self.shm.buf, 0)[2]
+
+    def newSearch(self):
+        HEADER.pack_into(self.shm.buf, 0, MAGIC, self.entries, (self.generation + 1) & 0xFF)
+
+    def _slot(self, key, player):
+        high = key >> 64 | (player == MIN) << 20
+        low = key & MASK64
+        offset = HEADER_SIZE + ((low ^ high * 0x9E3779B97F4A7C15) % self.entries) * ENTRY.size
+        return offset, low, high
+
+    def probe(self, game, player):
+        """(profondeur, type de borne, valeur, coup) ou None"""
+        self.stats['probes'] += 1
+        offset, low, high = self._slot(positionKey(game), player)
+        key_low, key_high, meta, value, check = ENTRY.unpack_from(self.shm.buf, offset)
+        if not meta & 1 or key_low != low or key_high != high:
+            return None
+        if check != low ^ (high << 32 | meta) ^ (value & MASK64):
+            self.stats['collisions'] += 1
+            return None
+        self.stats['hits'] += 1
+        depth, flag, move, _ = unpackMeta(meta)
+        return depth, flag, value / VALUE_SCALE, move
+
+    def store(self, game, player, depth, flag, value, move):
+        offset, low, high = self._slot(positionKey(game), player)
+        buf = self.shm.buf
+        _, _, old_meta, _, _ = ENTRY.unpack_from(buf, offset)
+        generation = self.generation
+        if old_meta & 1:
+            old_depth, _, _, old_generation = unpackMeta(old_meta)
+            if (generation - old_generation) & 0xFF < self.ageWindow and old_depth > depth:
+                return
+        meta = packMeta(depth, flag, move, generation)
+        fixed = int(round(value * VALUE_SCALE))
+        ENTRY.pack_into(buf, offset, low, high, meta, fixed, low ^ (high << 32 | meta) ^ (fixed & MASK64))
+        self.stats['stores'] += 1
+
+    def memoryUsage(self):
+        return HEADER_SIZE + self.entries * ENTRY.size
+
+    def clear(self):
+        self.shm.buf[HEADER_SIZE:] = bytes(self.entries * ENTRY.size)
+
+    def usage(self):
+        """Fraction des entrées occupées"""
+        buf = self.shm.buf
+        used = sum(1 for i in range(self.entries)
+                   if ENTRY.unpack_from(buf, HEADER_SIZE + i * ENTRY.size)[2] & 1)
+        return used / self.entries
+
+    # Persistance entre deux exécutions (reprise à chaud)
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.shm.buf)
+
+    def load(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, entries, _ = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or entries != self.entries:
+            raise ValueError(f"{path}: not a transposition table of {self.entries} entries")
+        self.shm.buf[:len(data)] = data
+
+    def close(self):
+        _attached.pop(self.name, None)
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        if self.owner:
+            self.unlink()
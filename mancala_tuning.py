@@ -0,0 +1,198 @@
+"""Réglage automatique des pondérations de evaluateAlt par SPSA.
+
+À chaque itération, deux variantes du vecteur de poids (perturbé de +/- c_k
+dans une direction aléatoire) s'affrontent en paires de parties (même
+ouverture aléatoire, couleurs inversées) ; le score obtenu donne une
+estimation du gradient. Les parties sont réparties sur tous les coeurs.
+
+    python mancala_tuning.py --iterations 50 --pairs 64 --checkpoint tuning.json
+    python mancala_match.py --player2 alt --alt-weights tuning.json
+
+Le point de contrôle (JSON) est réécrit à chaque itération : relancer la
+même commande reprend là où le réglage s'était arrêté. À la fin, les poids
+réglés affrontent les poids d'origine (ALT_WEIGHTS) et le gain est donné en
+Elo avec un intervalle de confiance.
+
+Le poids des graines dans les pits reste fixé à 1 : multiplier tous les
+poids par une constante ne change pas le jeu. Les parties se jouent par
+défaut à la profondeur du moteur 'alt' de mancala_match.py (ALT_DEPTH),
+pour régler les poids là où ils seront utilisés.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from mancala import PlayAlt, ALT_WEIGHTS, ALT_DEPTH
+from mancala_match import playGame
+
+TUNED = ('store', 'ready', 'empty')
+
+
+class AltEngine:
+    """Fabrique (transmissible à un processus) de PlayAlt à poids donnés"""
+
+    def __init__(self, weights, depth=ALT_DEPTH):
+        self.weights = dict(ALT_WEIGHTS, **weights)
+        self.depth = depth
+
+    def __call__(self, game, player):
+        return PlayAlt(game, player, weights=self.weights, depth=self.depth)
+
+    def __str__(self):
+        return "alt(" + ", ".join(f"{k}={v:.3g}" for k, v in self.weights.items()) + ")"
+
+
+# Paire de parties exécutée dans un processus du pool
+def playPair(engineA, engineB, seed, randomPlies):
+    """Résultats de A (1, 0.5 ou 0) sur deux parties : même ouverture, couleurs inversées"""
+    results = []
+    for a_first in (True, False):
+        player1, player2 = (engineA, engineB) if a_first else (engineB, engineA)
+        record = playGame(player1, player2, randomPlies=randomPlies, rng=random.Random(seed))
+        own, other = record['store1'], record['store2']
+        if not a_first:
+            own, other = other, own
+        results.append(1.0 if own > other else 0.5 if own == other else 0.0)
+    return results
+
+
+def runMatch(executor, engineA, engineB, pairs, seed, randomPlies):
+    rng = random.Random(seed)
+    seeds = [rng.getrandbits(32) for _ in range(pairs)]
+    results = []
+    for pair in executor.map(playPair, [engineA] * pairs, [engineB] * pairs,
+                             seeds, [randomPlies] * pairs):
+        results.extend(pair)
+    return results
+
+
+def eloFromScore(score):
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400.0 * math.log10(1.0 / score - 1.0)
+
+
+def eloInterval(results, z=1.96):
+    """(Elo, borne basse, borne haute) : approximation normale du score moyen"""
+    n = len(results)
+    mean = sum(results) / n
+    variance = sum((r - mean) ** 2 for r in results) / max(1, n - 1)
+    margin = z * math.sqrt(variance / n)
+    return eloFromScore(mean), eloFromScore(mean - margin), eloFromScore(mean + margin)
+
+
+class SPSATuner:
+
+    def __init__(self, theta=None, a=2.0, c=0.5, A=5.0, alpha=0.602, gamma=0.101,
+                 pairs=32, depth=ALT_DEPTH, randomPlies=4, seed=0):
+        self.theta = dict(theta or {name: float(ALT_WEIGHTS[name]) for name in TUNED})
+        self.a, self.c, self.A = a, c, A
+        self.alpha, self.gamma = alpha, gamma
+        self.pairs = pairs
+        self.depth = depth
+        self.randomPlies = randomPlies
+        self.seed = seed
+        self.iteration = 0
+        self.history = []
+
+    def step(self, executor):
+        k = self.iteration
+        rng = random.Random(f"{self.seed}:{k}")
+        ck = self.c / (k + 1) ** self.gamma
+        ak = self.a / (k + 1 + self.A) ** self.alpha
+        delta = {name: rng.choice((-1, 1)) for name in self.theta}
+        plus = {name: v + ck * delta[name] for name, v in self.theta.items()}
+        minus = {name: v - ck * delta[name] for name, v in self.theta.items()}
+
+        results = runMatch(executor, AltEngine(plus, self.depth), AltEngine(minus, self.depth),
+                           self.pairs, rng.getrandbits(32), self.randomPlies)
+        score = sum(results) / len(results)
+        # y(+) - y(-) = 2 * score - 1 (match en tête-à-tête)
+        for name in self.theta:
+            self.theta[name] += ak * (2 * score - 1) / (2 * ck * delta[name])
+
+        self.iteration += 1
+        self.history.append({'iteration': self.iteration, 'score': round(score, 4),
+                             'games': len(results), 'theta': dict(self.theta)})
+        return score
+
+    def weights(self):
+        return dict(ALT_WEIGHTS, **self.theta)
+
+    def save(self, path):
+        state = {
+            'weights': self.weights(),
+            'theta': self.theta,
+            'iteration': self.iteration,
+            'history': self.history,
+            'settings': {'a': self.a, 'c': self.c, 'A': self.A, 'alpha': self.alpha,
+                         'gamma': self.gamma, 'pairs': self.pairs, 'depth': self.depth,
+                         'randomPlies': self.randomPlies, 'seed': self.seed},
+        }
+        tmp = path + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            state = json.load(f)
+        tuner = cls(state['theta'], **state['settings'])
+        tuner.iteration = state['iteration']
+        tuner.history = state['history']
+        return tuner
+
+
+def loadWeights(path):
+    """Poids d'un fichier de mancala_tuning.py (point de contrôle ou dict simple)"""
+    with open(path) as f:
+        data = json.load(f)
+    return dict(ALT_WEIGHTS, **data.get('weights', data))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tune evaluateAlt weights with SPSA self-play")
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--pairs', type=int, default=32, help="game pairs per iteration")
+    parser.add_argument('--depth', type=int, default=ALT_DEPTH,
+                        help="search depth of the tuned engines (default: the 'alt' engine's)")
+    parser.add_argument('--random-plies', type=int, default=4)
+    parser.add_argument('--a', type=float, default=2.0, help="SPSA step size")
+    parser.add_argument('--c', type=float, default=0.5, help="SPSA perturbation size")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help="default: all cores")
+    parser.add_argument('--checkpoint', default='tuning.json')
+    parser.add_argument('--evaluate-pairs', type=int, default=200,
+                        help="game pairs of the final match against ALT_WEIGHTS (0 skips it)")
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.checkpoint):
+        tuner = SPSATuner.load(args.checkpoint)
+        print(f"Resuming from iteration {tuner.iteration}", file=sys.stderr)
+    else:
+        tuner = SPSATuner(a=args.a, c=args.c, pairs=args.pairs, depth=args.depth,
+                          randomPlies=args.random_plies, seed=args.seed)
+
+    with ProcessPoolExecutor(max_workers=args.workers or os.cpu_count()) as executor:
+        while tuner.iteration < args.iterations:
+            score = tuner.step(executor)
+            tuner.save(args.checkpoint)
+            theta = ", ".join(f"{k}={v:.3f}" for k, v in tuner.theta.items())
+            print(f"Iteration {tuner.iteration}: score(+) {score:.3f}  {theta}", file=sys.stderr)
+
+        if args.evaluate_pairs:
+            results = runMatch(executor, AltEngine(tuner.theta, tuner.depth),
+                               AltEngine({}, tuner.depth), args.evaluate_pairs,
+                               args.seed + 1, tuner.randomPlies)
+            elo, low, high = eloInterval(results)
+            print(f"Tuned vs original: score {sum(results) / len(results):.3f} over "
+                  f"{len(results)} games, Elo {elo:+.0f} (95% CI {low:+.0f} .. {high:+.0f})")
+    print(json.dumps(tuner.weights()))
+
+
+if __name__ == "__main__":
+    main()